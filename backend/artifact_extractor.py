@@ -0,0 +1,599 @@
+"""
+Streaming artifact extraction from ansible-playbook (-vvv, default callback) output.
+
+StreamingArtifactExtractor is fed every stdout line while the playbook runs
+and keeps only the state it needs (current task, one pending host result,
+one JSON block being accumulated), so extraction is linear in the output
+size, memory stays bounded however long the run is, and the artifacts are
+ready as soon as the process exits:
+
+    extractor = StreamingArtifactExtractor(hosts, variables)
+    for line in output:
+        extractor.feed(line)
+    artifacts = extractor.finish(execution_id)
+
+Each artifact is a dict with execution_id, task_name, register_name,
+register_data (JSON text), host_name and task_status, ready for Artifact(**data).
+"""
+
+import json
+import re
+
+# "TASK [Install packages] *****"
+TASK_LINE_RE = re.compile(r'TASK \[(.*?)\]')
+# Host result lines, e.g. "changed: [10.0.0.5] => {" or "fatal: [web1]: UNREACHABLE! => {...}"
+HOST_RESULT_RE = re.compile(r'\b(ok|changed|failed|fatal|skipped|unreachable): \[([^\]]+)\]')
+UNREACHABLE_RE = re.compile(r'fatal: \[(.*?)\]: UNREACHABLE!')
+
+# A JSON result block is abandoned after this many continuation lines
+MAX_JSON_LINES = 100
+# Lines after a result (without inline JSON) that may still start its JSON block
+MAX_LOOKAHEAD_LINES = 9
+# Lines after a result used as plain multi-line output for a basic artifact
+MAX_OUTPUT_LINES = 4
+
+RESULT_FIELDS = ['msg', 'stdout', 'stderr', 'rc', 'changed', 'failed', 'skipped', 'unreachable']
+ERROR_FIELDS = ['failed_reason', 'reason', 'exception']
+STATUS_TOKENS = ["ok:", "changed:", "failed:", "fatal:", "skipped:"]
+
+
+def clean_ansible_output(output_text):
+    """
+    Clean up Ansible output by removing escape sequences and formatting it properly.
+    """
+    if not output_text:
+        return output_text
+
+    # Remove carriage returns and normalize line endings
+    cleaned = output_text.replace('\r', '')
+
+    # Remove common Ansible escape sequences
+    cleaned = cleaned.replace('\\n', '\n').replace('\\r', '').replace('\\t', '\t')
+
+    # Remove ANSI color codes and control sequences
+    cleaned = re.sub(r'\x1b\[[0-9;]*[a-zA-Z]', '', cleaned)
+
+    # Drop trailing whitespace and blank lines
+    cleaned = '\n'.join(line.rstrip() for line in cleaned.split('\n') if line.strip())
+
+    # Truncate if too long (keep first 2000 characters)
+    if len(cleaned) > 2000:
+        cleaned = cleaned[:2000] + '\n... (output truncated)'
+
+    return cleaned
+
+
+def format_package_results(results):
+    """Group dnf/yum style results ("Installed: foo", "Removed: bar", ...) for display"""
+    groups = [
+        ('Installed:', "📦 INSTALLED PACKAGES:", []),
+        ('Updated:', "🔄 UPDATED PACKAGES:", []),
+        ('Removed:', "🗑️ REMOVED PACKAGES:", []),
+    ]
+    other_packages = []
+    for result in results:
+        result = str(result)
+        for prefix, _, packages in groups:
+            if result.startswith(prefix):
+                packages.append(result.replace(prefix + ' ', ''))
+                break
+        else:
+            other_packages.append(result)
+
+    formatted_output = []
+    for _, title, packages in groups + [(None, "📋 OTHER CHANGES:", other_packages)]:
+        if packages:
+            formatted_output.append(title)
+            formatted_output.extend([f"  • {pkg}" for pkg in packages])
+            formatted_output.append("")
+    return '\n'.join(formatted_output)
+
+
+def salvage_register_data(json_content):
+    """Best-effort field recovery from a result block that is not valid JSON"""
+    useful_data = {}
+
+    if '"changed":' in json_content:
+        useful_data['changed'] = 'true' in json_content.lower()
+
+    stdout_match = json_content.find('"stdout":')
+    if stdout_match != -1:
+        start = json_content.find('"', stdout_match + 9)
+        if start != -1:
+            end = json_content.find('",', start + 1)
+            if end == -1:
+                end = json_content.find('"}', start + 1)
+            if end != -1:
+                cleaned_stdout = clean_ansible_output(json_content[start + 1:end])
+                useful_data['stdout'] = cleaned_stdout
+                useful_data['msg'] = f"Task output: {cleaned_stdout[:100]}..."
+
+    # RedHat dnf/yum "results" list
+    results_match = json_content.find('"results":')
+    if results_match != -1:
+        start = json_content.find('[', results_match)
+        if start != -1:
+            end = json_content.find(']', start + 1)
+            if end != -1:
+                results_items = [item.strip().strip('"') for item in json_content[start + 1:end].split(',') if item.strip()]
+                useful_data['stdout'] = format_package_results(results_items)
+                useful_data['msg'] = f"RedHat system packages updated successfully ({len(results_items)} packages affected)"
+
+    if not useful_data:
+        useful_data = {
+            'msg': "Task completed successfully (JSON parsing failed)",
+            'raw_content': json_content[:500],
+            'error': True
+        }
+    return useful_data
+
+
+def fix_register_msg(register_data):
+    """Replace empty, truncated or placeholder msg values with something readable"""
+    if not isinstance(register_data, dict) or not isinstance(register_data.get('msg'), str):
+        return
+    msg_value = register_data['msg']
+    if msg_value.strip() == '{' or (msg_value.startswith('{') and not msg_value.endswith('}')):
+        register_data['msg'] = "Task completed successfully"
+    elif len(msg_value.strip()) < 5:
+        if register_data.get('stdout'):
+            register_data['msg'] = f"Task output: {register_data['stdout'][:100]}..."
+        else:
+            register_data['msg'] = "Task completed successfully"
+
+
+def summarize_register_data(register_data):
+    """Keep only the fields worth showing in the artifact viewer"""
+    if not isinstance(register_data, dict):
+        return {'raw_output': str(register_data)}
+
+    useful_data = {}
+    for field in RESULT_FIELDS:
+        if field in register_data:
+            field_value = register_data[field]
+            if field in ['stdout', 'stderr'] and isinstance(field_value, str):
+                field_value = clean_ansible_output(field_value)
+            try:
+                json.dumps(field_value)
+                useful_data[field] = field_value
+            except (TypeError, ValueError):
+                useful_data[field] = str(field_value)
+
+    if isinstance(register_data.get('results'), list):
+        useful_data['stdout'] = format_package_results(register_data['results'])
+        useful_data['msg'] = f"RedHat system packages updated successfully ({len(register_data['results'])} packages affected)"
+
+    for field in ERROR_FIELDS:
+        if field in register_data:
+            useful_data[field] = register_data[field]
+
+    # Command/shell module results
+    if 'cmd' in register_data:
+        useful_data['command'] = register_data['cmd']
+    if 'start' in register_data and 'end' in register_data:
+        useful_data['execution_time'] = f"{register_data['start']} - {register_data['end']}"
+
+    if not any(field in useful_data for field in ['msg', 'stdout', 'stderr']):
+        summary_parts = []
+        if 'changed' in register_data:
+            summary_parts.append(f"Status: {'CHANGED' if register_data['changed'] else 'OK'}")
+        facts = register_data.get('ansible_facts')
+        if isinstance(facts, dict):
+            if 'ansible_hostname' in facts:
+                summary_parts.append(f"Host: {facts['ansible_hostname']}")
+            if 'ansible_distribution' in facts:
+                summary_parts.append(f"OS: {facts['ansible_distribution']}")
+        useful_data['msg'] = "; ".join(summary_parts) if summary_parts else "Task completed successfully"
+
+    return useful_data
+
+
+def create_task_summary(task_name, task_status, hostname, register_data=None, raw_line=""):
+    """
+    Create a user-friendly summary of a task execution.
+    """
+    status_emoji = {
+        'ok': '✅',
+        'changed': '🔄',
+        'failed': '❌',
+        'fatal': '💀',
+        'skipped': '⏭️',
+        'unreachable': '🚫'
+    }
+
+    status_description = {
+        'ok': 'SUCCESS',
+        'changed': 'CHANGED',
+        'failed': 'FAILED',
+        'fatal': 'FATAL ERROR',
+        'skipped': 'SKIPPED',
+        'unreachable': 'UNREACHABLE'
+    }
+
+    emoji = status_emoji.get(task_status, '❓')
+    description = status_description.get(task_status, task_status.upper())
+
+    summary_lines = [
+        f"═══════════════════════════════════════════════════════════",
+        f"{emoji} TASK EXECUTION SUMMARY",
+        f"═══════════════════════════════════════════════════════════",
+        f"📋 Task: {task_name}",
+        f"🖥️  Host: {hostname}",
+        f"📊 Status: {description}",
+        f"═══════════════════════════════════════════════════════════",
+    ]
+
+    # Add specific information based on status
+    if task_status in ['failed', 'fatal', 'unreachable']:
+        summary_lines.append(f"🚨 ERROR DETAILS:")
+
+        # Extract detailed error information from register_data
+        if register_data and isinstance(register_data, dict):
+            # Get error message
+            error_msg = (register_data.get('msg', '') or
+                        register_data.get('stderr', '') or
+                        register_data.get('failed_reason', '') or
+                        register_data.get('reason', ''))
+
+            if error_msg:
+                summary_lines.append(f"   💬 Message: {error_msg}")
+
+            # Get stderr if available
+            stderr = register_data.get('stderr', '')
+            if stderr and stderr != error_msg:
+                summary_lines.append(f"   🚫 Error Output: {stderr}")
+
+            # Get stdout if available (sometimes has useful info even on failures)
+            stdout = register_data.get('stdout', '')
+            if stdout:
+                summary_lines.append(f"   📤 Standard Output: {stdout}")
+
+            # Get return code if available
+            rc = register_data.get('rc')
+            if rc is not None:
+                summary_lines.append(f"   🔢 Return Code: {rc}")
+
+            # Show raw ansible output if available
+            if 'ansible_facts' in register_data:
+                summary_lines.append(f"   📋 Ansible Facts: Available")
+
+        else:
+            # Fallback to parsing from raw line
+            if "UNREACHABLE!" in raw_line:
+                summary_lines.append(f"   💬 Message: Host is unreachable")
+            elif "failed:" in raw_line:
+                parts = raw_line.split("failed:")
+                if len(parts) > 1:
+                    summary_lines.append(f"   💬 Message: {parts[1].strip()}")
+            else:
+                summary_lines.append(f"   💬 Message: Task execution failed")
+
+    elif task_status in ['changed', 'ok']:
+        if task_status == 'changed':
+            summary_lines.append(f"🔄 CHANGES MADE:")
+        else:
+            summary_lines.append(f"✅ SUCCESS:")
+        if register_data and isinstance(register_data, dict):
+            stdout = register_data.get('stdout', '')
+            stderr = register_data.get('stderr', '')
+            msg = register_data.get('msg', '')
+
+            if msg:
+                summary_lines.append(f"   💬 Message: {msg}")
+            if stdout:
+                summary_lines.append(f"   📤 Standard Output:")
+                summary_lines.append(f"      {stdout}")
+            if stderr:
+                summary_lines.append(f"   ⚠️  Warnings/Errors:")
+                summary_lines.append(f"      {stderr}")
+
+            # Show return code if available
+            rc = register_data.get('rc')
+            if rc is not None:
+                summary_lines.append(f"   🔢 Return Code: {rc}")
+        elif task_status == 'changed':
+            summary_lines.append(f"   Task completed successfully with changes")
+        else:
+            summary_lines.append(f"   Task completed successfully")
+
+    elif task_status == 'skipped':
+        summary_lines.append(f"⏭️  SKIPPED:")
+        if register_data and isinstance(register_data, dict):
+            skip_reason = register_data.get('skip_reason', register_data.get('msg', 'Condition not met'))
+            summary_lines.append(f"   Reason: {skip_reason}")
+        else:
+            summary_lines.append(f"   Task was skipped due to condition")
+
+    summary_lines.append(f"═══════════════════════════════════════════════════════════")
+
+    return '\n'.join(summary_lines)
+
+
+class _JsonBlock:
+    """Incrementally accumulated JSON text with string-aware brace depth"""
+
+    def __init__(self, text):
+        self.parts = []
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.line_count = 0
+        self.add(text)
+
+    def add(self, text):
+        self.parts.append(text)
+        self.line_count += 1
+        for ch in text:
+            if self.escape:
+                self.escape = False
+            elif ch == '\\' and self.in_string:
+                self.escape = True
+            elif ch == '"':
+                self.in_string = not self.in_string
+            elif not self.in_string:
+                if ch == '{':
+                    self.depth += 1
+                elif ch == '}':
+                    self.depth -= 1
+
+    @property
+    def complete(self):
+        return self.depth <= 0
+
+    @property
+    def text(self):
+        return '\n'.join(self.parts)
+
+
+class _PendingResult:
+    """A host result line whose artifact still depends on the lines that follow it"""
+
+    def __init__(self, task_name, task_status, host_name, line):
+        self.task_name = task_name
+        self.task_status = task_status
+        self.host_name = host_name
+        self.line = line
+        self.lookahead = []          # lines seen since the result line
+        self.json_block = None       # set once the result's JSON block starts
+        self.json_inline = False     # JSON started on the result line itself
+
+
+class StreamingArtifactExtractor:
+    """Incremental state machine turning ansible output lines into artifact records"""
+
+    def __init__(self, hosts, variables=None):
+        self.current_task = None
+        self.artifacts = []
+        self._seen = set()           # (task_name, host_name) pairs that already have an artifact
+        self._pending = None
+        self._line_count = 0
+
+        # Map every accepted host token (hostname, last IP octet, short name) to the configured hostname
+        self.hostnames = {}
+        for h in hosts or []:
+            if isinstance(h, dict):
+                primary = h.get('hostname', h.get('name', str(h)))
+            else:
+                primary = getattr(h, 'hostname', None) or getattr(h, 'name', None) or str(h)
+            self._add_host(primary)
+
+        # Dynamic IPs from variables (for variable-defined hosts)
+        if variables:
+            ips_value = variables.get('ips') or variables.get('hosts')
+            if isinstance(ips_value, str):
+                for ip in ips_value.split(','):
+                    ip = ip.strip()
+                    if ip and ip not in ['all', 'targets']:
+                        self._add_host(ip)
+
+    def _add_host(self, hostname):
+        if not hostname:
+            return
+        self.hostnames[hostname] = hostname
+        if '.' in hostname:
+            self.hostnames.setdefault(hostname.split('.')[-1], hostname)
+            self.hostnames.setdefault(hostname.split('.')[0], hostname)
+
+    def feed(self, line):
+        """Consume one output line"""
+        self._line_count += 1
+        try:
+            self._consume(line.strip())
+        except Exception as e:
+            print(f"⚠️  Artifact extraction error at line {self._line_count}: {e}")
+            self._pending = None
+
+    def finish(self, execution_id):
+        """Flush any pending result and return the artifacts stamped with execution_id"""
+        if self._pending is not None:
+            self._resolve_pending()
+        for artifact in self.artifacts:
+            artifact['execution_id'] = execution_id
+        print(f"🎯 Extracted {len(self.artifacts)} artifacts from {self._line_count} output lines")
+        return self.artifacts
+
+    def _consume(self, line):
+        pending = self._pending
+        if pending is not None:
+            if pending.json_block is not None:
+                if line and self._is_boundary(line):
+                    # A new task/result interrupts the block: keep what we have
+                    self._resolve_pending()
+                else:
+                    if line:
+                        pending.json_block.add(line)
+                    if pending.json_block.complete or pending.json_block.line_count > MAX_JSON_LINES:
+                        self._resolve_pending()
+                    return
+            elif line and self._is_boundary(line):
+                self._resolve_pending()
+            else:
+                if line.startswith('{'):
+                    pending.json_block = _JsonBlock(line)
+                    if pending.json_block.complete:
+                        self._resolve_pending()
+                    return
+                pending.lookahead.append(line)
+                if len(pending.lookahead) >= MAX_LOOKAHEAD_LINES:
+                    self._resolve_pending()
+                return
+
+        if not line:
+            return
+
+        task_match = TASK_LINE_RE.search(line) if "TASK [" in line else None
+        if task_match and "] **" in line:
+            self.current_task = task_match.group(1).strip()
+            return
+
+        result_match = HOST_RESULT_RE.search(line)
+        if result_match and result_match.group(2) in self.hostnames:
+            task_status, token = result_match.groups()
+            if not self.current_task:
+                return
+            pending = _PendingResult(self.current_task, task_status, self.hostnames[token], line)
+            if "=> {" in line:
+                pending.json_inline = True
+                pending.json_block = _JsonBlock(line[line.find("=> {") + 3:].strip())
+                self._pending = pending
+                if pending.json_block.complete:
+                    self._resolve_pending()
+            else:
+                self._pending = pending
+            return
+
+        # Unreachable hosts that don't match a configured hostname, e.g. "fatal: [host-192-168-10-141]: UNREACHABLE!"
+        if "UNREACHABLE!" in line and "fatal:" in line:
+            self._handle_unknown_unreachable(line)
+
+    def _is_boundary(self, line):
+        if line.startswith('TASK ['):
+            return True
+        lower = line.lower()
+        return any(token in lower for token in ['ok: [', 'changed: [', 'failed: [', 'fatal: [', 'skipped: [', 'unreachable: ['])
+
+    def _resolve_pending(self):
+        pending, self._pending = self._pending, None
+        if pending.json_block is not None:
+            self._add_register_artifact(pending)
+            if pending.json_inline:
+                return
+        self._add_basic_artifact(pending)
+
+    def _record(self, task_name, host_name, task_status, register_data):
+        self._seen.add((task_name, host_name))
+        self.artifacts.append({
+            'execution_id': None,
+            'task_name': task_name,
+            'register_name': f"{task_name.replace(' ', '_').lower()}_result",
+            'register_data': register_data,
+            'host_name': host_name,
+            'task_status': task_status
+        })
+
+    def _add_register_artifact(self, pending):
+        json_content = pending.json_block.text
+        try:
+            register_data = json.loads(json_content)
+        except json.JSONDecodeError:
+            register_data = salvage_register_data(json_content)
+        fix_register_msg(register_data)
+
+        useful_data = summarize_register_data(register_data)
+        useful_data['task_name'] = pending.task_name
+        useful_data['host_name'] = pending.host_name
+        useful_data['task_status'] = pending.task_status
+        try:
+            serialized_data = json.dumps(useful_data, indent=2)
+        except Exception:
+            serialized_data = json.dumps({'error': 'JSON serialization failed', 'raw_data': str(useful_data)}, indent=2)
+        self._record(pending.task_name, pending.host_name, pending.task_status, serialized_data)
+
+    def _add_basic_artifact(self, pending):
+        """Artifact for results without JSON output (skips Gathering Facts unless it failed)"""
+        task_name, task_status, line = pending.task_name, pending.task_status, pending.line
+        if (task_name, pending.host_name) in self._seen:
+            return
+        if task_name in ['Gathering Facts'] and task_status not in ['fatal', 'unreachable', 'failed']:
+            return
+
+        basic_data = {
+            'task_name': task_name,
+            'host_name': pending.host_name,
+            'task_status': task_status,
+            'msg': f"Task '{task_name}' completed with status: {task_status}"
+        }
+
+        extracted_msg = None
+        if "=> " in line:
+            extracted_msg = line.split("=> ", 1)[1].strip()
+            if extracted_msg.startswith('"') and extracted_msg.endswith('"'):
+                extracted_msg = extracted_msg[1:-1]
+        elif "| " in line and (" rc=" in line or " changed=" in line):
+            # Format: output | SUCCESS | rc=0 >>
+            for part in line.split(" | "):
+                if ">>" in part:
+                    extracted_msg = part.split(">>", 1)[-1].strip()
+                    break
+        elif "failed:" in line or "fatal:" in line:
+            for key, prefix in (('msg=', ''), ('stderr=', 'Error: ')):
+                start = line.find(key)
+                if start != -1:
+                    start += len(key)
+                    if line[start:start + 1] == '"':
+                        end = line.find('"', start + 1)
+                        if end != -1:
+                            extracted_msg = prefix + line[start + 1:end]
+                    break
+
+        if "UNREACHABLE" in line:
+            basic_data['msg'] = extracted_msg or "Host is unreachable - connection failed"
+            basic_data['failed'] = True
+            basic_data['unreachable'] = True
+        elif "failed:" in line:
+            basic_data['msg'] = extracted_msg or "Task execution failed - check task configuration"
+            basic_data['failed'] = True
+        elif "fatal:" in line:
+            basic_data['msg'] = extracted_msg or "Fatal error during task execution"
+            basic_data['failed'] = True
+            basic_data['fatal'] = True
+        elif "changed:" in line:
+            basic_data['msg'] = extracted_msg or f"Task '{task_name}' completed successfully with changes"
+            basic_data['changed'] = True
+        elif "skipped:" in line:
+            basic_data['msg'] = extracted_msg or f"Task '{task_name}' was skipped (condition not met)"
+            basic_data['skipped'] = True
+        elif "ok:" in line:
+            basic_data['msg'] = extracted_msg or f"Task '{task_name}' completed successfully"
+            basic_data['changed'] = False
+        elif extracted_msg:
+            basic_data['msg'] = extracted_msg
+
+        # Plain multi-line output right after the result (e.g. shell output)
+        if not extracted_msg and pending.lookahead:
+            multi_line_output = []
+            for candidate in pending.lookahead[:MAX_OUTPUT_LINES]:
+                if (not candidate or candidate.startswith("---") or
+                        any(status in candidate for status in STATUS_TOKENS)):
+                    break
+                multi_line_output.append(candidate)
+            if multi_line_output and len(multi_line_output[0]) > 10 and len(' '.join(multi_line_output)) > 20:
+                basic_data['msg'] = ' '.join(multi_line_output)
+                basic_data['stdout'] = '\n'.join(multi_line_output)
+
+        self._record(task_name, pending.host_name, task_status, json.dumps(basic_data, indent=2))
+
+    def _handle_unknown_unreachable(self, line):
+        match = UNREACHABLE_RE.search(line)
+        if not match or not self.current_task or self.current_task in ['Gathering Facts']:
+            return
+        unreachable_host = match.group(1)
+        original_hostname = unreachable_host
+        for host_name in set(self.hostnames.values()):
+            if host_name in unreachable_host or unreachable_host.replace('host-', '').replace('-', '.') == host_name:
+                original_hostname = host_name
+                break
+        if (self.current_task, original_hostname) in self._seen:
+            return
+        summary = create_task_summary(self.current_task, "unreachable", original_hostname, None, line)
+        self._record(self.current_task, original_hostname, 'unreachable', summary)
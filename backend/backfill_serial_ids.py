@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Migration: Stored serial IDs for execution history
+
+Adds the indexed execution_history.serial_id column and backfills it, so
+history listings read the stored number instead of running a COUNT(*) query
+per row. The same backfill runs automatically at startup; this script is for
+applying it ahead of an upgrade or checking the result.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the backend directory to the path to import models
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import db
+from app import app
+from database_init import ensure_additional_columns, backfill_serial_ids
+
+def migrate():
+    """Add execution_history.serial_id and backfill it"""
+    
+    print("🔄 Starting migration: Stored serial IDs for execution history...")
+    
+    with app.app_context():
+        ensure_additional_columns()
+        backfill_serial_ids()
+        
+        remaining = db.session.execute(text("""
+            SELECT COUNT(*) FROM execution_history WHERE serial_id IS NULL
+        """)).scalar()
+        if remaining:
+            print(f"❌ Migration incomplete: {remaining} history rows still have no serial_id")
+            sys.exit(1)
+        print("✅ Migration completed successfully!")
+
+if __name__ == "__main__":
+    migrate()
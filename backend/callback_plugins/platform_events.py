@@ -0,0 +1,129 @@
+"""
+Ansible callback plugin that writes one JSON object per line for every task
+result to the file named by PLATFORM_EVENTS_FILE.
+
+It runs alongside the default stdout callback (which still feeds the live
+output view); the backend reads the event file after the run to get host
+results and artifacts without parsing the text output. Enabled per run by
+event_results.prepare_event_capture().
+
+Event records:
+    {"event": "task_start", "task": ..., "task_uuid": ...}
+    {"event": "runner", "status": "ok|changed|failed|fatal|skipped|unreachable",
+     "host": ..., "delegated_to": ..., "task": ..., "task_uuid": ..., "action": ...,
+     "item": <label or null>, "ignore_errors": bool, "result": {...}}
+    {"event": "stats", "hosts": {host: {"ok": n, "changed": n, "failures": n,
+     "unreachable": n, "skipped": n, "rescued": n, "ignored": n}}}
+"""
+
+import json
+import os
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = '''
+    name: platform_events
+    type: aggregate
+    short_description: write task results as JSON lines for the automation platform
+    description:
+      - Appends one JSON record per task start, task result and the final stats
+        to the file named by the PLATFORM_EVENTS_FILE environment variable.
+    requirements:
+      - enable in configuration
+'''
+
+FACT_ACTIONS = ('gather_facts', 'setup', 'ansible.builtin.gather_facts', 'ansible.builtin.setup')
+# The only facts the artifact viewer shows; everything else is dropped to keep the file small
+KEPT_FACTS = ('ansible_hostname', 'ansible_distribution')
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'platform_events'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        path = os.environ.get('PLATFORM_EVENTS_FILE')
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def _write(self, record, flush=False):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, default=str) + '\n')
+        if flush:
+            self._file.flush()
+
+    def _result_data(self, result):
+        data = result._result
+        if data.get('_ansible_no_log'):
+            return {'censored': "the output has been hidden due to the fact that 'no_log: true' was specified for this result",
+                    'changed': data.get('changed', False)}
+        cleaned = {}
+        for key, value in data.items():
+            if key.startswith('_ansible') or key == 'invocation':
+                continue
+            if key == 'ansible_facts' and isinstance(value, dict):
+                value = dict((name, value[name]) for name in KEPT_FACTS if name in value)
+            cleaned[key] = value
+        return cleaned
+
+    def _runner_event(self, status, result, item=False, ignore_errors=False):
+        data = result._result
+        delegated_vars = data.get('_ansible_delegated_vars') or {}
+        task = result._task
+        record = {
+            'event': 'runner',
+            'status': status,
+            'host': result._host.get_name(),
+            'delegated_to': delegated_vars.get('ansible_host'),
+            'task': task.get_name().strip(),
+            'task_uuid': task._uuid,
+            'action': task.action,
+            'item': self._get_item_label(data) if item else None,
+            'ignore_errors': bool(ignore_errors),
+        }
+        if task.action in FACT_ACTIONS and status == 'ok':
+            record['result'] = {'changed': False}
+        else:
+            record['result'] = self._result_data(result)
+        self._write(record)
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._write({'event': 'task_start', 'task': task.get_name().strip(), 'task_uuid': task._uuid}, flush=True)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self.v2_playbook_on_task_start(task, False)
+
+    def v2_runner_on_ok(self, result):
+        self._runner_event('changed' if result._result.get('changed') else 'ok', result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._runner_event('fatal', result, ignore_errors=ignore_errors)
+
+    def v2_runner_on_skipped(self, result):
+        self._runner_event('skipped', result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._runner_event('unreachable', result)
+
+    def v2_runner_item_on_ok(self, result):
+        self._runner_event('changed' if result._result.get('changed') else 'ok', result, item=True)
+
+    def v2_runner_item_on_failed(self, result):
+        self._runner_event('failed', result, item=True)
+
+    def v2_runner_item_on_skipped(self, result):
+        self._runner_event('skipped', result, item=True)
+
+    def v2_playbook_on_stats(self, stats):
+        hosts = {}
+        for host in sorted(stats.processed.keys()):
+            summary = stats.summarize(host)
+            hosts[host] = dict((key, summary.get(key, 0)) for key in
+                               ('ok', 'changed', 'failures', 'unreachable', 'skipped', 'rescued', 'ignored'))
+        self._write({'event': 'stats', 'hosts': hosts}, flush=True)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
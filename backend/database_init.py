@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime
 from werkzeug.security import generate_password_hash
 from sqlalchemy import text
-from models import db, User, Playbook, Host, HostGroup, Task, ExecutionHistory, Credential, Webhook, ApiToken
+from models import db, User, Playbook, Host, HostGroup, HostGroupMembership, Task, ExecutionHistory, Credential, Webhook, ApiToken
 
 def create_database_schema():
     """Create all database tables and schema"""
@@ -22,6 +22,9 @@ def create_database_schema():
         # Add any additional columns that might be missing
         ensure_additional_columns()
         
+        # Give legacy rows a stored serial ID
+        backfill_serial_ids()
+        
     except Exception as e:
         print(f"❌ Error creating database schema: {e}")
         raise
@@ -75,6 +78,46 @@ def ensure_additional_columns():
             ALTER TABLE tasks ADD COLUMN IF NOT EXISTS webhook_id VARCHAR(36);
         """))
         
+        # Ensure priority column exists in tasks table (execution queue ordering)
+        db.session.execute(text("""
+            ALTER TABLE tasks ADD COLUMN IF NOT EXISTS priority INTEGER DEFAULT 0;
+        """))
+        
+        # Ensure webhook trigger coalescing columns exist
+        db.session.execute(text("""
+            ALTER TABLE webhooks ADD COLUMN IF NOT EXISTS coalesce_window_seconds INTEGER DEFAULT 0;
+        """))
+        
+        db.session.execute(text("""
+            ALTER TABLE tasks ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(128);
+        """))
+        
+        db.session.execute(text("""
+            ALTER TABLE tasks ADD COLUMN IF NOT EXISTS created_at TIMESTAMP;
+        """))
+        
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_tasks_webhook_idempotency_key ON tasks (webhook_id, idempotency_key);
+        """))
+        
+        # Ensure stored (indexed) serial_id column exists in execution_history table
+        db.session.execute(text("""
+            ALTER TABLE execution_history ADD COLUMN IF NOT EXISTS serial_id INTEGER;
+        """))
+        
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_execution_history_serial_id ON execution_history (serial_id);
+        """))
+        
+        # The ascending (finished_at, id) index could not serve the DESC NULLS LAST ordering
+        db.session.execute(text("""
+            DROP INDEX IF EXISTS ix_execution_history_finished_at_id;
+        """))
+        
+        db.session.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_execution_history_finished_desc_id ON execution_history (finished_at DESC NULLS LAST, id DESC);
+        """))
+        
         # Ensure user_id column exists in execution_history table
         # Check if column exists using information_schema
         try:
@@ -102,6 +145,101 @@ def ensure_additional_columns():
         db.session.rollback()
         print(f"⚠️ Warning: Could not ensure additional columns: {e}")
 
+def backfill_serial_ids():
+    """
+    One-time backfill of stored serial IDs (safe to run repeatedly: only touches NULL rows).
+
+    History rows take their original task's serial ID. Rows older than that column,
+    and tasks created before serial IDs existed, are numbered after the highest ID
+    in use, in start order, so no number is shared by two executions.
+    """
+    try:
+        from sqlalchemy import func
+        
+        copied = db.session.execute(text("""
+            UPDATE execution_history SET serial_id = original_task_serial_id
+            WHERE serial_id IS NULL AND original_task_serial_id IS NOT NULL
+        """)).rowcount
+        
+        legacy_history = [row[0] for row in db.session.query(ExecutionHistory.id)
+                          .filter(ExecutionHistory.serial_id.is_(None))
+                          .order_by(ExecutionHistory.started_at, ExecutionHistory.id)]
+        legacy_tasks = [row[0] for row in db.session.query(Task.id)
+                        .filter(Task.serial_id.is_(None))
+                        .order_by(Task.started_at, Task.id)]
+        
+        if legacy_history or legacy_tasks:
+            next_id = max(
+                db.session.query(func.max(ExecutionHistory.serial_id)).scalar() or 0,
+                db.session.query(func.max(ExecutionHistory.original_task_serial_id)).scalar() or 0,
+                db.session.query(func.max(Task.serial_id)).scalar() or 0
+            ) + 1
+            for history_id in legacy_history:
+                db.session.execute(
+                    text("UPDATE execution_history SET serial_id = :serial_id WHERE id = :id"),
+                    {'serial_id': next_id, 'id': history_id}
+                )
+                next_id += 1
+            for task_id in legacy_tasks:
+                db.session.execute(
+                    text("UPDATE tasks SET serial_id = :serial_id WHERE id = :id"),
+                    {'serial_id': next_id, 'id': task_id}
+                )
+                next_id += 1
+        
+        db.session.commit()
+        if copied or legacy_history or legacy_tasks:
+            print(f"✅ Backfilled serial IDs: {copied} history rows from their task, "
+                  f"{len(legacy_history)} legacy history rows, {len(legacy_tasks)} tasks")
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Warning: Could not backfill serial IDs: {e}")
+
+def migrate_host_group_memberships():
+    """
+    Populate host_group_memberships from the legacy Host.group_id / Host.group_ids (JSON)
+    columns. Idempotent: only missing rows are inserted, references to deleted groups are skipped.
+    """
+    try:
+        import json
+        
+        group_ids = {str(group_id) for (group_id,) in db.session.query(HostGroup.id).all()}
+        existing = {(str(host_id), str(group_id)) for host_id, group_id in
+                    db.session.query(HostGroupMembership.host_id, HostGroupMembership.group_id).all()}
+        
+        now = datetime.utcnow()
+        missing = []
+        for host_id, group_id, group_ids_json in db.session.query(Host.id, Host.group_id, Host.group_ids).all():
+            declared = []
+            if group_ids_json:
+                try:
+                    parsed = json.loads(group_ids_json)
+                    if isinstance(parsed, list):
+                        declared = [str(value) for value in parsed]
+                except (TypeError, ValueError):
+                    print(f"⚠️ Host {host_id} has malformed group_ids, only its primary group is migrated")
+            if group_id:
+                declared.append(str(group_id))
+            for declared_id in dict.fromkeys(declared):
+                key = (str(host_id), declared_id)
+                if declared_id in group_ids and key not in existing:
+                    existing.add(key)
+                    missing.append({'host_id': key[0], 'group_id': key[1], 'created_at': now})
+        
+        if missing:
+            db.session.execute(text("""
+                INSERT INTO host_group_memberships (host_id, group_id, created_at)
+                VALUES (:host_id, :group_id, :created_at)
+            """), missing)
+        db.session.commit()
+        if missing:
+            print(f"✅ Migrated {len(missing)} host group memberships")
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Warning: Could not migrate host group memberships: {e}")
+
 def seed_default_data():
     """Seed the database with default data"""
     print("Seeding default data...")
@@ -478,6 +616,9 @@ def initialize_database():
         # Seed with default data
         seed_default_data()
         
+        # Host/group membership table from the legacy group columns
+        migrate_host_group_memberships()
+        
         print("🎉 Database initialization completed successfully!")
         return True
         
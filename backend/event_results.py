@@ -0,0 +1,274 @@
+"""
+Host results and artifacts built from structured Ansible events.
+
+With EXECUTION_RESULT_MODE=events (the default) every playbook run also loads
+the platform_events callback plugin (callback_plugins/platform_events.py),
+which writes one JSON record per task result plus the final stats to a
+per-task event file. After the run the executors read that file instead of
+reverse-engineering the -vvv text output:
+
+    events_path = prepare_event_capture(env, task_id)
+    ... run ansible-playbook with env ...
+    event_results = load_event_results(events_path, hosts, variables)
+    if event_results is not None:
+        analysis = event_results.analyze_hosts()
+        artifacts = event_results.artifacts(execution_id)
+
+load_event_results() returns None when the file is missing or holds no
+results (plugin not loaded, process killed early, EXECUTION_RESULT_MODE=text);
+callers then fall back to the text parsers.
+"""
+
+import json
+import os
+import tempfile
+
+from artifact_extractor import fix_register_msg, summarize_register_data
+
+EXECUTION_RESULT_MODE = os.environ.get('EXECUTION_RESULT_MODE', 'events').lower()
+EXECUTION_EVENTS_DIR = os.environ.get('EXECUTION_EVENTS_DIR', tempfile.gettempdir())
+CALLBACK_PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'callback_plugins')
+CALLBACK_NAME = 'platform_events'
+
+FAILED_STATUSES = ('failed', 'fatal')
+SUCCESS_STATUSES = ('ok', 'changed')
+
+
+def prepare_event_capture(env, task_id):
+    """
+    Enable the event callback in an ansible-playbook environment.
+    Returns the event file path, or None when running in text mode.
+    """
+    if EXECUTION_RESULT_MODE != 'events':
+        return None
+    os.makedirs(EXECUTION_EVENTS_DIR, exist_ok=True)
+    events_path = os.path.join(EXECUTION_EVENTS_DIR, f'ansible_events_{task_id}.jsonl')
+    discard_event_file(events_path)
+
+    plugin_dirs = [CALLBACK_PLUGIN_DIR]
+    if env.get('ANSIBLE_CALLBACK_PLUGINS'):
+        plugin_dirs.append(env['ANSIBLE_CALLBACK_PLUGINS'])
+    enabled = [name.strip() for name in env.get('ANSIBLE_CALLBACKS_ENABLED', '').split(',') if name.strip()]
+    if CALLBACK_NAME not in enabled:
+        enabled.append(CALLBACK_NAME)
+
+    env.update({
+        'ANSIBLE_CALLBACK_PLUGINS': os.pathsep.join(plugin_dirs),
+        'ANSIBLE_CALLBACKS_ENABLED': ','.join(enabled),
+        'PLATFORM_EVENTS_FILE': events_path
+    })
+    return events_path
+
+
+def discard_event_file(events_path):
+    if not events_path:
+        return
+    try:
+        os.unlink(events_path)
+    except OSError:
+        pass
+
+
+def load_event_results(events_path, hosts, variables=None):
+    """Read an event file into an EventResults, or None if there is nothing usable"""
+    if not events_path or not os.path.exists(events_path):
+        return None
+    results = EventResults(hosts, variables)
+    try:
+        with open(events_path, encoding='utf-8') as events_file:
+            for line in events_file:
+                results.add_line(line)
+    except OSError as e:
+        print(f"⚠️ Could not read event file {events_path}: {e}")
+        return None
+    if not results.has_results:
+        print(f"⚠️ Event file {events_path} has no task results, falling back to output parsing")
+        return None
+    print(f"📨 Loaded {results.event_count} structured events from {events_path}")
+    return results
+
+
+def _new_counts():
+    return {'ok': 0, 'changed': 0, 'failures': 0, 'unreachable': 0, 'skipped': 0, 'ignored': 0}
+
+
+class EventResults:
+    """Per-host task counts, recap stats and artifacts collected from callback events"""
+
+    def __init__(self, hosts, variables=None):
+        self.event_count = 0
+        self.has_results = False
+        self.hostnames = []
+        self.counts = {}           # host -> counts from task result events
+        self.stats = {}            # host -> ansible's own recap stats (authoritative when present)
+        self._artifacts = []
+        self._item_tasks = set()   # (task_uuid, inventory host) pairs that reported per-item results
+
+        for h in hosts or []:
+            if isinstance(h, dict):
+                hostname = h.get('hostname', h.get('name', str(h)))
+            else:
+                hostname = getattr(h, 'hostname', None) or getattr(h, 'name', None) or str(h)
+            self._add_host(hostname)
+
+        # Dynamic IPs from variables (for variable-defined hosts)
+        if variables:
+            ips_value = variables.get('ips') or variables.get('hosts')
+            if isinstance(ips_value, str):
+                for ip in ips_value.split(','):
+                    ip = ip.strip()
+                    if ip and ip not in ['all', 'targets']:
+                        self._add_host(ip)
+
+    def _add_host(self, hostname):
+        if hostname and hostname not in self.counts:
+            self.hostnames.append(hostname)
+            self.counts[hostname] = _new_counts()
+
+    def add_line(self, line):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # Last line of a killed run may be cut short
+            return
+        self.event_count += 1
+        kind = event.get('event')
+        if kind == 'runner':
+            self._add_runner_event(event)
+        elif kind == 'stats':
+            for hostname, host_stats in (event.get('hosts') or {}).items():
+                self._add_host(hostname)
+                self.stats[hostname] = host_stats
+
+    def _add_runner_event(self, event):
+        self.has_results = True
+        host = event.get('host')
+        status = event.get('status')
+        task_name = event.get('task') or 'unnamed task'
+        task_key = (event.get('task_uuid'), host)
+
+        if event.get('item') is not None:
+            self._item_tasks.add(task_key)
+            # Loops delegated to configured targets (delegate_to: "{{ item }}") are
+            # attributed to the target rather than to the host running the play
+            target = event.get('delegated_to')
+            if target in self.counts and target != host:
+                self._count(target, status, event.get('ignore_errors'))
+            else:
+                target = host
+            self._add_artifact(task_name, target, status, event)
+            return
+
+        self._add_host(host)
+        self._count(host, status, event.get('ignore_errors'))
+        if task_key not in self._item_tasks:
+            self._add_artifact(task_name, host, status, event)
+
+    def _count(self, hostname, status, ignore_errors=False):
+        counts = self.counts.setdefault(hostname, _new_counts())
+        if status in SUCCESS_STATUSES:
+            counts['ok'] += 1
+            if status == 'changed':
+                counts['changed'] += 1
+        elif status in FAILED_STATUSES:
+            counts['ignored' if ignore_errors else 'failures'] += 1
+        elif status in ('unreachable', 'skipped'):
+            counts[status] += 1
+
+    def _add_artifact(self, task_name, host_name, task_status, event):
+        if task_name in ['Gathering Facts'] and task_status not in ['fatal', 'unreachable', 'failed']:
+            return
+        register_data = event.get('result') or {}
+        fix_register_msg(register_data)
+        useful_data = summarize_register_data(register_data)
+        if event.get('item') is not None:
+            useful_data['item'] = event['item']
+        useful_data['task_name'] = task_name
+        useful_data['host_name'] = host_name
+        useful_data['task_status'] = task_status
+        try:
+            serialized_data = json.dumps(useful_data, indent=2)
+        except Exception:
+            serialized_data = json.dumps({'error': 'JSON serialization failed', 'raw_data': str(useful_data)}, indent=2)
+        self._artifacts.append({
+            'execution_id': None,
+            'task_name': task_name,
+            'register_name': f"{task_name.replace(' ', '_').lower()}_result",
+            'register_data': serialized_data,
+            'host_name': host_name,
+            'task_status': task_status
+        })
+
+    def _host_counts(self, hostname):
+        """Recap stats when ansible reported them for the host, else the counted task results"""
+        if hostname in self.stats:
+            stats = self.stats[hostname]
+            return stats.get('ok', 0), stats.get('failures', 0), stats.get('unreachable', 0)
+        counts = self.counts[hostname]
+        return counts['ok'], counts['failures'], counts['unreachable']
+
+    def analyze_hosts(self):
+        """
+        Same shape as analyze_ansible_output():
+        {'host_results': {host: success|partial|failed}, 'task_failures': {host: {...}}}
+        """
+        host_results = {}
+        task_failures = {}
+        for hostname in self.hostnames:
+            ok, failures, unreachable = self._host_counts(hostname)
+            counts = self.counts[hostname]
+            task_failures[hostname] = {
+                'failed_tasks': counts['failures'],
+                'total_tasks': counts['ok'] + counts['failures'] + counts['ignored'] + counts['skipped'] + counts['unreachable'],
+                'successful_tasks': counts['ok']
+            }
+            if unreachable > 0:
+                host_results[hostname] = 'failed'
+            elif failures > 0:
+                host_results[hostname] = 'partial' if ok > 0 else 'failed'
+            elif ok > 0 or counts['skipped'] > 0:
+                host_results[hostname] = 'success'
+            else:
+                host_results[hostname] = 'unknown'
+
+        # Hosts no event mentioned (e.g. only referenced in variables): judge by the run as a whole
+        any_failure = any(status == 'failed' for status in host_results.values())
+        for hostname, status in host_results.items():
+            if status == 'unknown':
+                host_results[hostname] = 'failed' if any_failure else 'success'
+
+        print(f"📨 Event-based host results: {host_results}")
+        return {'host_results': host_results, 'task_failures': task_failures}
+
+    def partial_success_summary(self):
+        """Same shape as analyze_ansible_output_for_partial_success(): (status, success_count, failed_count, host_results)"""
+        host_results = {}
+        for hostname in self.hostnames:
+            ok, failures, unreachable = self._host_counts(hostname)
+            if failures > 0 or unreachable > 0:
+                host_results[hostname] = 'failed'
+            elif ok > 0:
+                host_results[hostname] = 'success'
+            else:
+                host_results[hostname] = 'unknown'
+
+        success_count = sum(1 for status in host_results.values() if status == 'success')
+        failed_count = sum(1 for status in host_results.values() if status == 'failed')
+        if success_count > 0 and failed_count == 0:
+            overall_status = 'completed'
+        elif success_count > 0 and failed_count > 0:
+            overall_status = 'partial'
+        else:
+            overall_status = 'failed'
+
+        print(f"📨 Event-based execution analysis: {overall_status} ({success_count} succeeded, {failed_count} failed)")
+        return overall_status, success_count, failed_count, host_results
+
+    def artifacts(self, execution_id):
+        for artifact in self._artifacts:
+            artifact['execution_id'] = execution_id
+        print(f"🎯 Built {len(self._artifacts)} artifacts from {self.event_count} structured events")
+        return self._artifacts
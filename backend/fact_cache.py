@@ -0,0 +1,154 @@
+"""
+Per-host Ansible fact cache shared by all executions.
+
+Executions run with ANSIBLE_GATHERING=smart but had no fact cache
+configured, so each new ansible-playbook process gathered facts from every
+host again. FactCache points Ansible's jsonfile cache plugin at a directory
+under FACT_CACHE_DIR for every execution:
+
+    fact_cache.configure(env, username)      # before starting ansible-playbook
+
+Facts depend on who gathered them (become, privileges, user-specific paths),
+so each remote user gets its own scope, FACT_CACHE_DIR/<sha256(username)>.
+With gathering=smart, a host whose facts are cached in that scope and younger
+than FACT_CACHE_TTL_SECONDS is not contacted for fact gathering. Ansible writes
+one JSON file per inventory hostname. The backend reads the same files (in every
+scope) to show when a host's facts were gathered, and deletes them from every
+scope to invalidate a host (for example, after it is rebuilt or its address
+changes).
+
+The cache is opt-in: FACT_CACHE_TTL_SECONDS defaults to 0, and executions then
+gather facts as they did before. Cached facts can be up to TTL seconds stale.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+FACT_CACHE_DIR = os.environ.get('FACT_CACHE_DIR', './fact_cache')
+FACT_CACHE_TTL_SECONDS = max(0, _env_int('FACT_CACHE_TTL_SECONDS', 0))
+
+
+class FactCache:
+    """Ansible jsonfile fact cache, one directory per remote user and one file per inventory hostname"""
+
+    def __init__(self, cache_dir=None, ttl=None):
+        self.cache_dir = os.path.abspath(cache_dir or FACT_CACHE_DIR)
+        self.ttl = FACT_CACHE_TTL_SECONDS if ttl is None else ttl
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def user_dir(self, username):
+        """Cache directory of the facts gathered as username"""
+        return os.path.join(self.cache_dir, hashlib.sha256(str(username or '').encode('utf-8')).hexdigest())
+
+    def configure(self, env, username):
+        """Make an ansible-playbook environment connecting as username read and write its cache"""
+        if not self.enabled:
+            return
+        user_dir = self.user_dir(username)
+        os.makedirs(user_dir, exist_ok=True)
+        env.update({
+            'ANSIBLE_GATHERING': 'smart',
+            'ANSIBLE_CACHE_PLUGIN': 'jsonfile',
+            'ANSIBLE_CACHE_PLUGIN_CONNECTION': user_dir,
+            'ANSIBLE_CACHE_PLUGIN_TIMEOUT': str(self.ttl),
+        })
+
+    def _user_dirs(self):
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                return [entry.path for entry in entries if entry.is_dir()]
+        except OSError:
+            return []
+
+    def _paths(self, inventory_hostname):
+        """Cache files of inventory_hostname in every user scope"""
+        name = os.path.basename(str(inventory_hostname or ''))
+        return [os.path.join(user_dir, name) for user_dir in self._user_dirs()] if name else []
+
+    def snapshot(self):
+        """{inventory hostname: time facts were last gathered, by any user} for every unexpired entry"""
+        if not self.enabled:
+            return {}
+        cutoff = time.time() - self.ttl
+        gathered = {}
+        for user_dir in self._user_dirs():
+            try:
+                with os.scandir(user_dir) as entries:
+                    for entry in entries:
+                        try:
+                            mtime = entry.stat().st_mtime
+                        except OSError:
+                            continue
+                        if entry.is_file() and mtime >= cutoff and mtime > gathered.get(entry.name, 0):
+                            gathered[entry.name] = mtime
+            except OSError:
+                continue
+        return gathered
+
+    def status(self, inventory_hostnames, snapshot=None):
+        """Fact cache state of a host known under any of inventory_hostnames"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        gathered_at = max((snapshot[name] for name in inventory_hostnames if name in snapshot), default=None)
+        if gathered_at is None:
+            return {'cached': False, 'gathered_at': None, 'expires_at': None}
+        return {
+            'cached': True,
+            'gathered_at': _iso(gathered_at),
+            'expires_at': _iso(gathered_at + self.ttl),
+        }
+
+    def load(self, inventory_hostnames):
+        """Most recently cached facts of a host known under any of inventory_hostnames, or None"""
+        if not self.enabled:
+            return None
+        cutoff = time.time() - self.ttl
+        candidates = []
+        for name in inventory_hostnames:
+            for path in self._paths(name):
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if mtime >= cutoff:
+                    candidates.append((mtime, path))
+        for _, path in sorted(candidates, reverse=True):
+            try:
+                with open(path, 'r', encoding='utf-8') as facts_file:
+                    return json.load(facts_file)
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def invalidate(self, inventory_hostnames):
+        """Forget the facts of a host for every user; returns how many cache files were removed"""
+        removed = 0
+        for name in set(inventory_hostnames):
+            for path in self._paths(name):
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+def _iso(timestamp):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+
+def host_inventory_names(host):
+    """Names a host can have in a generated inventory (hostname, or its name when aliased)"""
+    return [name for name in dict.fromkeys((host.hostname, host.name)) if name]
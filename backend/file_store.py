@@ -0,0 +1,204 @@
+"""
+Content-addressed storage for uploaded playbook files and per-execution workspaces.
+
+Uploaded files used to be saved flat into PLAYBOOKS_DIR under their original
+name, and every execution got playbook_files_dir=PLAYBOOKS_DIR. Every
+playbook could read every other playbook's files, and two playbooks uploading
+the same filename overwrote each other. Now:
+
+- FileStore keeps each distinct upload once, read-only, under
+  FILES_DIR/objects/<aa>/<sha256> (PlaybookFile.stored_filename is the hash
+  and PlaybookFile.file_path the object path). A blob is deleted when the
+  last PlaybookFile row referencing it goes away. Adopting an object and
+  committing the row that references it, and checking for references and
+  deleting the object, both happen under the digest's lock, so a new
+  upload of the same content never ends up pointing at a deleted blob:
+
+      digest, size, staged_path = file_store.stage(stream)
+      with file_store.lock(digest):
+          path = file_store.adopt(staged_path, digest)
+          ...                                # commit the PlaybookFile row
+- ExecutionWorkspaces gives each execution a private directory holding its
+  playbook's files only, under their original names (the playbook itself
+  still runs from PLAYBOOKS_DIR):
+
+      workspace_dir = execution_workspaces.create(task_id, [(name, source_path), ...])
+      ...
+      execution_workspaces.release(task_id)
+
+  Entries are reflinks of the stored objects (copy-on-write clones, on
+  filesystems that support them) and plain copies otherwise. They are never
+  hard links: a playbook running as root can write through a link despite
+  the 0444 mode, which would change the shared object for every other
+  playbook referencing it.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# ioctl request number for cloning a whole file (Linux btrfs/XFS/OCFS2 reflinks)
+FICLONE = 0x40049409
+
+_CHUNK_SIZE = 1024 * 1024
+_LOCK_STRIPES = 64
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+EXECUTION_WORKSPACE_DIR = os.environ.get('EXECUTION_WORKSPACE_DIR', './workspaces')
+EXECUTION_WORKSPACE_MAX_AGE_SECONDS = max(0.0, _env_float('EXECUTION_WORKSPACE_MAX_AGE_SECONDS', 86400))
+
+
+class FileStore:
+    """Immutable blobs named by the SHA-256 of their content"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(os.path.join(root, 'objects'))
+        self._tmp_dir = os.path.join(self.root, 'tmp')
+        # Re-entrant, so a caller holding a digest's lock can still adopt or discard under it
+        self._locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def contains(self, path):
+        """Whether path is an object of this store (as opposed to a legacy flat upload)"""
+        return os.path.abspath(path).startswith(self.root + os.sep)
+
+    def lock(self, digest):
+        """Lock serializing adoption and deletion of the object named digest"""
+        return self._locks[int(digest[:8], 16) % _LOCK_STRIPES]
+
+    def stage(self, stream):
+        """Write a binary stream to a temporary file in the store, returns (digest, size, staged path) for adopt()"""
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        sha = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+                    tmp_file.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return sha.hexdigest(), size, tmp_path
+
+    def adopt(self, source_path, digest):
+        """
+        Move a file whose SHA-256 is digest into the store (it must be on the same filesystem);
+        the file is dropped if the store already has the content. Returns the object path.
+        """
+        path = self.path_for(digest)
+        with self.lock(digest):
+            if os.path.exists(path):
+                os.unlink(source_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(source_path, 0o444)
+                os.replace(source_path, path)
+        return path
+
+    def discard(self, path, in_use=None):
+        """
+        Delete an object unless in_use(), checked under the object's lock, says it is still
+        referenced. Returns whether it was deleted.
+        """
+        with self.lock(os.path.basename(path)):
+            if in_use is not None and in_use():
+                return False
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return True
+
+
+def clone_or_copy(source_path, target_path):
+    """Materialize source at target as a reflink or a copy, never sharing writable data; returns which one was made"""
+    if fcntl is not None:
+        try:
+            with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            return 'cloned'
+        except OSError:
+            try:
+                os.unlink(target_path)
+            except OSError:
+                pass
+    shutil.copyfile(source_path, target_path)
+    return 'copied'
+
+
+class ExecutionWorkspaces:
+    """One private directory per execution, removed when the execution releases it"""
+
+    def __init__(self, root=None, max_age=None):
+        self.root = os.path.abspath(root or EXECUTION_WORKSPACE_DIR)
+        self.max_age = EXECUTION_WORKSPACE_MAX_AGE_SECONDS if max_age is None else max_age
+        self._lock = threading.Lock()
+
+    def path_for(self, owner):
+        return os.path.join(self.root, str(owner))
+
+    def create(self, owner, entries):
+        """
+        Fresh workspace for owner containing entries, a list of (filename, source_path).
+        Missing sources are skipped with a warning.
+        """
+        workspace_dir = self.path_for(owner)
+        with self._lock:
+            shutil.rmtree(workspace_dir, ignore_errors=True)
+            os.makedirs(workspace_dir)
+        counts = {}
+        for filename, source_path in entries:
+            if not os.path.exists(source_path):
+                print(f"⚠️ Workspace file {filename} is missing on disk ({source_path}), skipping")
+                continue
+            kind = clone_or_copy(source_path, os.path.join(workspace_dir, filename))
+            counts[kind] = counts.get(kind, 0) + 1
+        summary = ', '.join(f"{count} {kind}" for kind, count in sorted(counts.items())) or 'empty'
+        print(f"📂 Workspace for {owner} ready at {workspace_dir} ({summary})")
+        return workspace_dir
+
+    def release(self, owner):
+        shutil.rmtree(self.path_for(owner), ignore_errors=True)
+
+    def sweep(self):
+        """Remove workspaces older than max_age (left behind by a crashed process)"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                pass
+        if removed:
+            print(f"🧹 Removed {removed} stale execution workspace(s)")
+        return removed
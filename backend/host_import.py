@@ -0,0 +1,383 @@
+"""
+Set-based bulk host import used by POST /api/hosts/bulk.
+
+The old endpoint issued a hostname lookup per IP and then probed names one
+query at a time until it found a free one. BulkHostImporter instead:
+
+- prefetches (id, name, hostname, description, group columns) of every host
+  in one query,
+- decides per IP in memory whether to create or update, picking unique names
+  against an in-memory name set,
+- writes new hosts with multi-row INSERT ... ON CONFLICT (name) DO NOTHING
+  (PostgreSQL and SQLite; plain bulk inserts elsewhere), existing hosts with
+  bulk UPDATEs and group memberships with bulk INSERTs, in chunks of
+  HOST_IMPORT_CHUNK_SIZE rows.
+
+Rules are the same as before: with allow_duplicates an IP that already
+exists updates that host (description appended, group added), otherwise a
+new host named host-<ip> (with -1, -2... suffixes if taken) is created;
+without allow_duplicates an existing IP or name is reported as an error.
+
+Targets can also be CIDR blocks (10.0.0.0/16), address ranges (10.0.0.1-10.0.0.50
+or 10.0.0.1-50) and uploaded CSV/newline files. These are expanded lazily by
+iter_targets()/iter_file_targets() and fed through BulkHostImporter.run(), which
+commits every HOST_IMPORT_CHUNK_SIZE hosts and reports progress after each
+chunk, so a large subnet never sits in memory or in one long transaction.
+"""
+
+import csv
+import codecs
+import ipaddress
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models import db, Host, HostGroupMembership
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+HOST_IMPORT_CHUNK_SIZE = max(1, _env_int('HOST_IMPORT_CHUNK_SIZE', 1000))
+HOST_IMPORT_MAX_HOSTS = max(1, _env_int('HOST_IMPORT_MAX_HOSTS', 262144))
+# Imports touching more hosts than this return totals only, not every host record
+HOST_IMPORT_RESPONSE_LIMIT = max(0, _env_int('HOST_IMPORT_RESPONSE_LIMIT', 1000))
+
+_FILE_HEADER_CELLS = ('ip', 'ips', 'ip_address', 'address', 'host', 'hostname')
+_IMPORT_OWNER_TTL_SECONDS = 86400
+
+
+def chunked(items, size=None):
+    size = size or HOST_IMPORT_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def base_host_name(ip):
+    return f"host-{ip.replace('.', '-').replace(':', '-')}"
+
+
+def expand_target(value):
+    """
+    Yield the hosts named by one target: a CIDR block, an address range
+    (first-last, or first-N on the last IPv4 octet), or a single IP/hostname.
+    Raises ValueError for malformed blocks/ranges or ones over HOST_IMPORT_MAX_HOSTS.
+    """
+    value = str(value).strip()
+    if not value:
+        return
+
+    if '/' in value:
+        network = ipaddress.ip_network(value, strict=False)
+        if network.num_addresses > HOST_IMPORT_MAX_HOSTS:
+            raise ValueError(f"{value} has {network.num_addresses} addresses (limit {HOST_IMPORT_MAX_HOSTS})")
+        # hosts() leaves out the network/broadcast addresses (and handles /31, /32)
+        for address in network.hosts():
+            yield str(address)
+        return
+
+    if '-' in value:
+        first, _, last = value.partition('-')
+        try:
+            start = ipaddress.ip_address(first.strip())
+        except ValueError:
+            # Not an address range, just a hostname containing a dash
+            yield value
+            return
+        last = last.strip()
+        if last.isdigit() and start.version == 4:
+            end = ipaddress.ip_address(f"{first.strip().rsplit('.', 1)[0]}.{last}")
+        else:
+            end = ipaddress.ip_address(last)
+        if end.version != start.version or int(end) < int(start):
+            raise ValueError(f"Invalid address range {value}")
+        if int(end) - int(start) + 1 > HOST_IMPORT_MAX_HOSTS:
+            raise ValueError(f"{value} has {int(end) - int(start) + 1} addresses (limit {HOST_IMPORT_MAX_HOSTS})")
+        for number in range(int(start), int(end) + 1):
+            yield str(type(start)(number))
+        return
+
+    yield value
+
+
+def iter_targets(values, errors):
+    """Expand a sequence of targets lazily; bad blocks/ranges go to errors and are skipped"""
+    for value in values:
+        try:
+            yield from expand_target(value)
+        except ValueError as e:
+            errors.append(f"Invalid target {value}: {str(e)}")
+
+
+def iter_file_targets(stream, errors, encoding='utf-8'):
+    """
+    Targets from an uploaded CSV or newline-separated file (binary stream), read
+    line by line. The first non-empty cell of each row is used; blank lines,
+    # comments and a header row are skipped.
+    """
+    lines = codecs.iterdecode(stream, encoding, errors='replace')
+    for row in csv.reader(lines):
+        cell = next((cell.strip() for cell in row if cell.strip()), '')
+        if not cell or cell.startswith('#') or cell.lower() in _FILE_HEADER_CELLS:
+            continue
+        yield from iter_targets([cell], errors)
+
+
+def load_hosts(host_ids):
+    """Host objects for the given IDs, in the same order, loaded in chunks"""
+    by_id = {}
+    for chunk in chunked(list(host_ids)):
+        for host in Host.query.filter(Host.id.in_(chunk)).all():
+            by_id[host.id] = host
+    return [by_id[host_id] for host_id in host_ids if host_id in by_id]
+
+
+def _dialect_insert(table):
+    """INSERT that can skip conflicting rows, where the database supports it"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return None
+
+
+class BulkHostImporter:
+    """Create/update many hosts with a fixed number of queries per chunk"""
+
+    def __init__(self, group_id=None, description='', allow_duplicates=True):
+        self.group_id = group_id
+        self.description = description
+        self.allow_duplicates = allow_duplicates
+        self.created_ids = []
+        self.updated_ids = []
+        self.errors = []
+        self.processed = 0
+
+        self._names = set()
+        self._by_hostname = {}     # hostname -> existing host row (dict)
+        self._new_rows = []        # rows to INSERT
+        self._updates = {}         # host id -> row to UPDATE
+        self._prefetch()
+
+    def _prefetch(self):
+        columns = (Host.id, Host.name, Host.hostname, Host.description, Host.group_id, Host.group_ids)
+        for host_id, name, hostname, description, group_id, group_ids in db.session.query(*columns).all():
+            self._names.add(name)
+            # Like the old .first() lookup, the first host found for a hostname is the one updated
+            self._by_hostname.setdefault(hostname, {
+                'id': host_id,
+                'name': name,
+                'hostname': hostname,
+                'description': description,
+                'group_id': group_id,
+                'group_ids': group_ids,
+                'new': False
+            })
+
+    def add(self, ip):
+        """Plan the create/update for one IP (nothing is written until flush())"""
+        try:
+            ip = str(ip).strip()
+            if not ip:
+                return
+            base_name = base_host_name(ip)
+            existing = self._by_hostname.get(ip)
+
+            if not self.allow_duplicates:
+                if existing or base_name in self._names:
+                    self.errors.append(f"Host with IP {ip} or name {base_name} already exists")
+                    return
+                self._create(ip, base_name)
+                return
+
+            if existing:
+                self._update(existing)
+                return
+
+            name = base_name
+            counter = 1
+            while name in self._names:
+                name = f"{base_name}-{counter}"
+                counter += 1
+            self._create(ip, name)
+        except Exception as e:
+            self.errors.append(f"Failed to create host for IP {ip}: {str(e)}")
+
+    def add_all(self, ips):
+        for ip in ips:
+            self.add(ip)
+
+    @property
+    def pending(self):
+        return len(self._new_rows) + len(self._updates)
+
+    def progress(self, done=False):
+        return {
+            'processed': self.processed,
+            'created': len(self.created_ids),
+            'updated': len(self.updated_ids),
+            'errors': len(self.errors),
+            'done': done
+        }
+
+    def run(self, targets, on_progress=None):
+        """
+        Import an iterable of IPs/hostnames, committing every HOST_IMPORT_CHUNK_SIZE
+        planned writes. on_progress(progress_dict) is called after each commit.
+        Chunks committed before an exception stay committed.
+        """
+        for target in targets:
+            if self.processed >= HOST_IMPORT_MAX_HOSTS:
+                self.errors.append(f"Import stopped after {HOST_IMPORT_MAX_HOSTS} hosts (HOST_IMPORT_MAX_HOSTS)")
+                break
+            self.processed += 1
+            self.add(target)
+            if self.pending >= HOST_IMPORT_CHUNK_SIZE:
+                self.commit_chunk(on_progress)
+        self.commit_chunk(on_progress, done=True)
+
+    def commit_chunk(self, on_progress=None, done=False):
+        self.flush()
+        db.session.commit()
+        if on_progress:
+            on_progress(self.progress(done))
+
+    def _create(self, ip, name):
+        now = datetime.utcnow()
+        row = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'hostname': ip,
+            'description': self.description,
+            'group_id': self.group_id,
+            'group_ids': None,
+            'os_type': 'linux',
+            'port': 22,
+            'created_at': now,
+            'updated_at': now,
+            'new': True
+        }
+        self._names.add(name)
+        self._by_hostname[ip] = row
+        self._new_rows.append(row)
+
+    def _update(self, row):
+        if self.description:
+            row['description'] = f"{row['description']} | {self.description}" if row['description'] else self.description
+
+        if self.group_id:
+            # Same JSON bookkeeping as before: fold the primary group into group_ids and add the new one
+            existing_groups = []
+            if row['group_ids']:
+                try:
+                    existing_groups = json.loads(row['group_ids'])
+                except (TypeError, ValueError):
+                    existing_groups = []
+            elif row['group_id']:
+                existing_groups = [row['group_id']]
+            if self.group_id not in existing_groups:
+                existing_groups.append(self.group_id)
+            row['group_ids'] = json.dumps(existing_groups)
+
+        row['updated_at'] = datetime.utcnow()
+        if not row['new']:
+            self._updates[row['id']] = row
+        if row['id'] not in self.updated_ids:
+            self.updated_ids.append(row['id'])
+
+    def flush(self):
+        """Write everything planned so far (caller commits)"""
+        new_rows, self._new_rows = self._new_rows, []
+        updates, self._updates = list(self._updates.values()), {}
+
+        for chunk in chunked(new_rows):
+            self.created_ids.extend(self._insert_hosts(chunk))
+        for row in new_rows:
+            # Written now: a repeat of the IP in a later chunk has to UPDATE it
+            row['new'] = False
+
+        update_columns = ('id', 'description', 'group_ids', 'updated_at')
+        for chunk in chunked(updates):
+            db.session.bulk_update_mappings(Host, [{column: row[column] for column in update_columns} for row in chunk])
+
+        if self.group_id:
+            created = set(self.created_ids)
+            member_ids = [row['id'] for row in new_rows if row['id'] in created] + [row['id'] for row in updates]
+            for chunk in chunked(member_ids):
+                self._insert_memberships(chunk)
+
+    def _insert_hosts(self, rows):
+        """Insert new hosts, returning the IDs actually inserted"""
+        table = Host.__table__
+        values = [{key: value for key, value in row.items() if key != 'new'} for row in rows]
+        statement = _dialect_insert(table)
+        if statement is None:
+            db.session.execute(insert(table), values)
+            return [row['id'] for row in rows]
+
+        # Names were made unique in memory; a conflict means another import took the name meanwhile
+        statement = statement.on_conflict_do_nothing(index_elements=['name']).returning(table.c.id)
+        if db.engine.dialect.name == 'sqlite':
+            # Multi-row RETURNING is not available everywhere on SQLite: insert row by row
+            inserted = []
+            for value in values:
+                result = db.session.execute(statement.values(**value)).fetchone()
+                if result:
+                    inserted.append(result[0])
+        else:
+            inserted = [row[0] for row in db.session.execute(statement.values(values)).fetchall()]
+
+        inserted_set = set(inserted)
+        for row in rows:
+            if row['id'] not in inserted_set:
+                self.errors.append(f"Host name {row['name']} for IP {row['hostname']} was taken by a concurrent import")
+                self._by_hostname.pop(row['hostname'], None)
+        return inserted
+
+    def _insert_memberships(self, host_ids):
+        table = HostGroupMembership.__table__
+        now = datetime.utcnow()
+        values = [{'host_id': host_id, 'group_id': self.group_id, 'created_at': now} for host_id in host_ids]
+        statement = _dialect_insert(table)
+        if statement is None:
+            Host.add_to_group(host_ids, self.group_id)
+            return
+        db.session.execute(statement.values(values).on_conflict_do_nothing(index_elements=['host_id', 'group_id']))
+
+
+class ImportOwners:
+    """
+    Which user an import_id belongs to. The first user to use an id (by joining its progress
+    room or by starting the import) owns it; anyone else is refused, so progress of an
+    import is only ever delivered to its owner.
+    """
+
+    def __init__(self, ttl=_IMPORT_OWNER_TTL_SECONDS):
+        self.ttl = ttl
+        self._owners = {}   # import_id -> (user id, monotonic time of last use)
+        self._lock = threading.Lock()
+
+    def claim(self, import_id, user_id):
+        """Whether import_id is (now) owned by user_id"""
+        now = time.monotonic()
+        user_id = str(user_id)
+        with self._lock:
+            for stale_id in [key for key, (_, used) in self._owners.items() if now - used > self.ttl]:
+                del self._owners[stale_id]
+            owner = self._owners.get(import_id)
+            if owner and owner[0] != user_id:
+                return False
+            self._owners[import_id] = (user_id, now)
+            return True
@@ -0,0 +1,89 @@
+"""
+Short-lived in-process cache of the user behind a JWT identity.
+
+require_permission, get_current_user and the execute endpoint used to load the
+user row on every request, so dashboard polling hit the users table several
+times a second per open browser. IdentityCache keeps a small snapshot of each
+user (id, username, role) for USER_CACHE_TTL_SECONDS:
+
+    identity_cache = IdentityCache()
+    user = identity_cache.get(user_id, lambda: User.query.get(user_id))
+    if user and user.has_permission('read'): ...
+
+update_user/delete_user call invalidate(user_id) so role changes and deletions
+apply immediately in this process; other worker processes pick them up when
+their entry expires. USER_CACHE_TTL_SECONDS=0 disables the cache.
+"""
+
+import os
+import threading
+import time
+
+from models import User
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+USER_CACHE_TTL_SECONDS = max(0.0, _env_float('USER_CACHE_TTL_SECONDS', 30))
+
+
+class CachedIdentity:
+    """Detached, read-only view of a User: safe to share between requests and threads"""
+
+    __slots__ = ('id', 'username', 'role')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.role = user.role
+
+    def has_permission(self, action):
+        return User.role_has_permission(self.role, action)
+
+    def __repr__(self):
+        return f"<CachedIdentity {self.username} ({self.role})>"
+
+
+class IdentityCache:
+    """user id -> CachedIdentity, each entry expiring after ttl seconds"""
+
+    def __init__(self, ttl=None):
+        self.ttl = USER_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, loader):
+        """Cached identity for user_id, calling loader() (returns a User or None) on a miss"""
+        if user_id is None:
+            return None
+        user_id = str(user_id)
+        now = time.monotonic()
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        user = loader()
+        if user is None:
+            # Unknown users are not cached, so a newly created account works at once
+            self.invalidate(user_id)
+            return None
+        identity = CachedIdentity(user)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, identity)
+        return identity
+
+    def invalidate(self, user_id=None):
+        """Drop one user (or everything when user_id is None)"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
@@ -0,0 +1,256 @@
+"""
+Inventory generation for playbook executions.
+
+Each execution used to build an INI inventory by string concatenation, write
+it to a fresh temporary file and read the file back to print it. Inventories
+are now rendered from a structured model (hosts with their connection
+variables, plus group variables) in Ansible's YAML/JSON inventory format:
+
+    inventory_path = inventories.build(hosts, playbook.os_type, username, password, dynamic_ips)
+
+The model has the same groups as before. `targets` holds every host with its
+port and connection. `win` holds the Windows hosts and their WinRM
+variables. The user and SSH options are set on `all`.
+
+Rendered inventories are cached on disk under INVENTORY_CACHE_DIR, named by a
+hash of what they are built from (hosts, user, password or key auth, OS
+type, dynamic IPs). Repeated runs against the same fleet reuse the file
+without rendering or writing anything. Files are written once (temp file +
+rename, mode 0600), never modified, and removed once unused for
+INVENTORY_CACHE_TTL_SECONDS; the whole cache is cleared at startup.
+
+Cached inventories never contain passwords. Each run writes them to its own
+extra-vars file instead, readable only by the backend user, and removes it
+when the run ends:
+
+    credentials_path = write_credentials_file(password)
+    cmd += ['-e', f'@{credentials_path}']
+    ...
+    discard_credentials_file(credentials_path)
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+INVENTORY_CACHE_DIR = os.environ.get('INVENTORY_CACHE_DIR',
+                                     os.path.join(tempfile.gettempdir(), 'ansible_inventory_cache'))
+# Where inventories were cached before; they may still hold passwords
+LEGACY_INVENTORY_CACHE_DIR = './inventory_cache'
+INVENTORY_FORMAT = os.environ.get('INVENTORY_FORMAT', 'json').strip().lower()
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+INVENTORY_CACHE_TTL_SECONDS = max(0.0, _env_float('INVENTORY_CACHE_TTL_SECONDS', 3600))
+
+SSH_PASSWORD_ARGS = '-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -o PasswordAuthentication=yes -o PreferredAuthentications=password'
+SSH_KEY_ARGS = '-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -o PasswordAuthentication=no -o PreferredAuthentications=publickey'
+
+# Connection and become passwords, passed per run and never cached
+CREDENTIAL_VARS = ('ansible_ssh_pass', 'ansible_password', 'ansible_become_pass')
+
+_WINRM_PORT = re.compile(r'port (\d+)')
+_SWEEP_INTERVAL_SECONDS = 60
+
+
+def winrm_port(host):
+    """WinRM port of a host: 5986, unless its description says 'WinRM port <n>'"""
+    description = getattr(host, 'description', '') or ''
+    if 'WinRM port' in description:
+        port_match = _WINRM_PORT.search(description)
+        if port_match:
+            return int(port_match.group(1))
+    return 5986
+
+
+def dynamic_ips_from_variables(variables):
+    """Extra targets from a comma-separated 'ips' (or 'hosts') variable, in order, without duplicates"""
+    ips_value = (variables or {}).get('ips') or (variables or {}).get('hosts')
+    if not ips_value or not isinstance(ips_value, str):
+        return []
+    ips = (ip.strip() for ip in ips_value.split(','))
+    # Skip special keywords
+    return list(dict.fromkeys(ip for ip in ips if ip and ip not in ('all', 'targets')))
+
+
+def host_entries(hosts, is_windows, dynamic_ips=(), alias_names=False):
+    """[(inventory name, host vars)] for the configured hosts followed by dynamic IPs"""
+    entries = []
+    for host in hosts:
+        if is_windows:
+            host_vars = {'ansible_port': winrm_port(host),
+                         'ansible_connection': 'winrm',
+                         'ansible_winrm_server_cert_validation': 'ignore'}
+        else:
+            host_vars = {'ansible_port': getattr(host, 'port', 22) or 22,
+                         'ansible_connection': 'ssh'}
+        name = host.hostname
+        if alias_names and host.name and host.name != host.hostname:
+            name = host.name
+            host_vars['ansible_host'] = host.hostname
+        entries.append((name, host_vars))
+    for ip in dynamic_ips:
+        if is_windows:
+            entries.append((ip, {'ansible_port': 5986,
+                                 'ansible_connection': 'winrm',
+                                 'ansible_winrm_server_cert_validation': 'ignore'}))
+        else:
+            entries.append((ip, {'ansible_port': 22, 'ansible_connection': 'ssh'}))
+    return entries
+
+
+def inventory_model(entries, is_windows, username, use_password):
+    """Ansible YAML/JSON inventory structure for host entries; passwords are not part of it"""
+    all_vars = {'ansible_user': username}
+    if use_password:
+        all_vars['ansible_ssh_common_args'] = SSH_PASSWORD_ARGS
+    else:
+        all_vars['ansible_ssh_common_args'] = SSH_KEY_ARGS
+    all_vars['ansible_host_key_checking'] = False
+    all_vars['ansible_ssh_timeout'] = 30
+    all_vars['ansible_connect_timeout'] = 30
+
+    children = {'targets': {'hosts': dict(entries)}}
+    if is_windows and entries:
+        win_vars = {
+            'ansible_user': username,
+            'ansible_winrm_scheme': 'https',
+            'ansible_connection': 'winrm',
+            'ansible_winrm_server_cert_validation': 'ignore',
+            'ansible_become_method': 'runas',
+            'ansible_winrm_transport': 'ntlm',
+            'ansible_winrm_port': 5986,
+        }
+        children['win'] = {'hosts': {name: None for name, _ in entries}, 'vars': win_vars}
+    return {'all': {'vars': all_vars, 'children': children}}
+
+
+def render(model, output_format=None):
+    """Inventory file content; JSON is also valid YAML and much faster to produce"""
+    if (output_format or INVENTORY_FORMAT) == 'yaml':
+        import yaml
+        return yaml.safe_dump(model, default_flow_style=False, sort_keys=False)
+    return json.dumps(model, separators=(',', ':'))
+
+
+class InventoryCache:
+    """Rendered inventories on disk, keyed by a hash of their inputs"""
+
+    def __init__(self, cache_dir=None, ttl=None, output_format=None):
+        self.cache_dir = os.path.abspath(cache_dir or INVENTORY_CACHE_DIR)
+        self.ttl = INVENTORY_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.output_format = output_format or INVENTORY_FORMAT
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def cache_key(self, hosts, os_type, username, password, dynamic_ips=(), alias_names=False):
+        sha = hashlib.sha256()
+        for part in (self.output_format, (os_type or 'linux').lower(), username or '',
+                     'password' if password else 'key', 'alias' if alias_names else 'hostname'):
+            sha.update(part.encode('utf-8'))
+            sha.update(b'\0')
+        for host in hosts:
+            sha.update(f"{host.name}\t{host.hostname}\t{getattr(host, 'port', 22)}\t{winrm_port(host)}\n".encode('utf-8'))
+        sha.update(b'\0')
+        for ip in dynamic_ips:
+            sha.update(f"{ip}\n".encode('utf-8'))
+        return sha.hexdigest()
+
+    def build(self, hosts, os_type, username, password, dynamic_ips=(), alias_names=False):
+        """
+        Path of an inventory for these hosts and user, rendered only on a cache miss. The
+        password only selects password or key SSH options; pass it with write_credentials_file().
+        """
+        key = self.cache_key(hosts, os_type, username, password, dynamic_ips, alias_names)
+        suffix = '.yml' if self.output_format == 'yaml' else '.json'
+        path = os.path.join(self.cache_dir, f'inventory-{key}{suffix}')
+        count = len(hosts) + len(dynamic_ips)
+        with self._lock:
+            if os.path.exists(path):
+                # Mark as recently used so the sweep keeps it
+                os.utime(path)
+                print(f"📋 Reusing cached inventory for {count} host(s): {path}")
+            else:
+                is_windows = (os_type or 'linux').lower() == 'windows'
+                entries = host_entries(hosts, is_windows, dynamic_ips, alias_names)
+                self._write(path, render(inventory_model(entries, is_windows, username, bool(password)), self.output_format))
+                print(f"📋 Rendered inventory for {count} host(s): {path}")
+            self._maybe_sweep()
+        return path
+
+    def _write(self, path, content):
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.inventory-tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < _SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        self.sweep()
+
+    def sweep(self, max_age=None):
+        """Remove inventories unused for max_age seconds (default: the TTL); returns how many"""
+        cutoff = time.time() - (self.ttl if max_age is None else max_age)
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            if not name.startswith(('inventory-', '.inventory-tmp-')):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) <= cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def write_credentials_file(password, names=CREDENTIAL_VARS):
+    """
+    Extra-vars file (mode 0600) setting each of names to password, for `-e @<path>`;
+    None when there is no password. Remove it with discard_credentials_file().
+    """
+    if not password:
+        return None
+    fd, path = tempfile.mkstemp(prefix='ansible-credentials-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as credentials_file:
+            json.dump({name: password for name in names}, credentials_file)
+    except Exception:
+        discard_credentials_file(path)
+        raise
+    return path
+
+
+def discard_credentials_file(path):
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
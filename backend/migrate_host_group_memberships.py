@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Migration: Host/group membership table
+
+Creates the host_group_memberships association table and fills it from the
+legacy Host.group_id and Host.group_ids (JSON) columns, so group-filtered host
+queries run in SQL. The same migration runs automatically at startup; this
+script is for applying it ahead of an upgrade or checking the result.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the backend directory to the path to import models
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, HostGroupMembership
+from app import app
+from database_init import migrate_host_group_memberships
+
+def migrate():
+    """Create host_group_memberships and migrate the JSON group lists into it"""
+    
+    print("🔄 Starting migration: Host/group membership table...")
+    
+    with app.app_context():
+        try:
+            HostGroupMembership.__table__.create(bind=db.engine, checkfirst=True)
+        except Exception as e:
+            print(f"❌ Migration failed: could not create host_group_memberships: {e}")
+            sys.exit(1)
+        
+        migrate_host_group_memberships()
+        
+        total = db.session.execute(text("SELECT COUNT(*) FROM host_group_memberships")).scalar()
+        print(f"✅ Migration completed successfully! ({total} memberships)")
+
+if __name__ == "__main__":
+    migrate()
@@ -25,11 +25,16 @@ class User(db.Model):
     
     def has_permission(self, action):
         """Check if user has permission for an action"""
-        if self.role == 'admin':
+        return User.role_has_permission(self.role, action)
+    
+    @staticmethod
+    def role_has_permission(role, action):
+        """Check if a role has permission for an action"""
+        if role == 'admin':
             return True
-        elif self.role == 'editor':
+        elif role == 'editor':
             return action not in ['delete_user', 'delete_playbook', 'delete_host', 'delete_credential', 'delete_webhook', 'create_user', 'edit_user']
-        elif self.role == 'user':
+        elif role == 'user':
             return action in ['read', 'view']
         return False
     
@@ -108,45 +113,20 @@ class HostGroup(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
+    @staticmethod
+    def host_counts():
+        """Number of member hosts per group ID, in one query"""
+        rows = db.session.query(
+            HostGroupMembership.group_id,
+            db.func.count(HostGroupMembership.host_id)
+        ).group_by(HostGroupMembership.group_id).all()
+        return {str(group_id): count for group_id, count in rows}
+    
+    def to_dict(self, host_count=None):
         try:
-            import json
-            
-            # Count hosts that have this group in their group_ids JSON array OR single group_id
-            host_count = 0
-            
-            # Count hosts with single group_id (old way)
-            hosts_with_single_group = Host.query.filter_by(group_id=str(self.id)).count()
-            
-            # Count hosts with this group in their group_ids array (new way)
-            hosts_with_multiple_groups = 0
-            all_hosts = Host.query.filter(Host.group_ids.isnot(None)).all()
-            
-            for host in all_hosts:
-                if host.group_ids:
-                    try:
-                        group_ids = json.loads(host.group_ids)
-                        if str(self.id) in group_ids:
-                            hosts_with_multiple_groups += 1
-                    except:
-                        continue
-            
-            # Total unique hosts (avoid double counting)
-            host_count = hosts_with_single_group + hosts_with_multiple_groups
-            
-            # Subtract overlap (hosts that have both single group_id AND are in group_ids)
-            overlap_count = 0
-            hosts_with_single = Host.query.filter_by(group_id=str(self.id)).all()
-            for host in hosts_with_single:
-                if host.group_ids:
-                    try:
-                        group_ids = json.loads(host.group_ids)
-                        if str(self.id) in group_ids:
-                            overlap_count += 1
-                    except:
-                        continue
-            
-            host_count = host_count - overlap_count
+            # Member count from the association table (callers listing many groups pass it in)
+            if host_count is None:
+                host_count = HostGroupMembership.query.filter_by(group_id=str(self.id)).count()
             
             return {
                 'id': str(self.id),
@@ -188,45 +168,135 @@ class Host(db.Model):
     
     group = db.relationship('HostGroup', backref='hosts')
     
-    def to_dict(self):
+    def get_group_ids(self):
+        """Group IDs from the group_ids JSON array (empty list if unset or malformed)"""
+        if not self.group_ids:
+            return []
         try:
             import json
+            group_ids = json.loads(self.group_ids)
+            return [str(group_id) for group_id in group_ids] if isinstance(group_ids, list) else []
+        except (TypeError, ValueError):
+            return []
+    
+    def declared_group_ids(self):
+        """Groups named by the legacy columns: the group_ids JSON array plus the primary group_id"""
+        group_ids = self.get_group_ids()
+        if self.group_id and str(self.group_id) not in group_ids:
+            group_ids.append(str(self.group_id))
+        return group_ids
+    
+    def sync_group_memberships(self):
+        """Make this host's rows in host_group_memberships match group_id/group_ids (existing groups only)"""
+        desired = self.declared_group_ids()
+        if desired:
+            existing_groups = {str(group_id) for (group_id,) in
+                               db.session.query(HostGroup.id).filter(HostGroup.id.in_(desired)).all()}
+            desired = [group_id for group_id in desired if group_id in existing_groups]
+        current = {membership.group_id: membership for membership in
+                   HostGroupMembership.query.filter_by(host_id=self.id).all()}
+        for group_id, membership in current.items():
+            if group_id not in desired:
+                db.session.delete(membership)
+        for group_id in desired:
+            if group_id not in current:
+                db.session.add(HostGroupMembership(host_id=self.id, group_id=group_id))
+    
+    @staticmethod
+    def add_to_group(host_ids, group_id):
+        """Add memberships for many hosts at once, skipping hosts that are already members"""
+        host_ids = [str(host_id) for host_id in host_ids]
+        if not host_ids or not group_id:
+            return 0
+        already = {str(host_id) for (host_id,) in db.session.query(HostGroupMembership.host_id).filter(
+            HostGroupMembership.group_id == str(group_id),
+            HostGroupMembership.host_id.in_(host_ids)
+        ).all()}
+        new_ids = [host_id for host_id in dict.fromkeys(host_ids) if host_id not in already]
+        db.session.add_all([HostGroupMembership(host_id=host_id, group_id=str(group_id)) for host_id in new_ids])
+        return len(new_ids)
+    
+    @staticmethod
+    def query_in_groups(group_ids):
+        """Hosts belonging to any of the given groups, resolved in SQL through the membership index"""
+        group_ids = [str(group_id) for group_id in group_ids]
+        member_ids = db.session.query(HostGroupMembership.host_id).filter(
+            HostGroupMembership.group_id.in_(group_ids)
+        )
+        return Host.query.filter(Host.id.in_(member_ids))
+    
+    @staticmethod
+    def load_groups(hosts):
+        """
+        Group lookup for serializing hosts: (groups_by_id, group_ids_by_host), built with
+        two queries however many hosts there are.
+        """
+        host_ids = [host.id for host in hosts]
+        membership_query = db.session.query(HostGroupMembership.host_id, HostGroupMembership.group_id)
+        if len(host_ids) <= 1000:
+            membership_query = membership_query.filter(HostGroupMembership.host_id.in_(host_ids))
+        group_ids_by_host = {}
+        for host_id, group_id in membership_query.order_by(HostGroupMembership.created_at).all():
+            group_ids_by_host.setdefault(str(host_id), []).append(str(group_id))
+        
+        # Hosts without membership rows (not migrated yet) fall back to the legacy columns
+        for host in hosts:
+            if str(host.id) not in group_ids_by_host:
+                declared = host.declared_group_ids()
+                if declared:
+                    group_ids_by_host[str(host.id)] = declared
+        
+        group_ids = {str(host.group_id) for host in hosts if host.group_id}
+        for host_group_ids in group_ids_by_host.values():
+            group_ids.update(host_group_ids)
+        groups_by_id = {}
+        if group_ids:
+            groups_by_id = {str(group.id): group for group in HostGroup.query.filter(HostGroup.id.in_(group_ids)).all()}
+        return groups_by_id, group_ids_by_host
+    
+    @staticmethod
+    def to_dict_many(hosts):
+        """Serialize a list of hosts with a fixed number of queries (groups are resolved in bulk)"""
+        groups = Host.load_groups(hosts)
+        return [host.to_dict(groups) for host in hosts]
+    
+    def to_dict(self, groups=None):
+        try:
+            # Groups come from the bulk lookup when serializing many hosts, otherwise two queries for this host
+            if groups is None:
+                groups = Host.load_groups([self])
+            groups_by_id, group_ids_by_host = groups
             
             # Handle primary group (backward compatibility)
             group_data = None
-            if self.group:
+            primary_group = groups_by_id.get(str(self.group_id)) if self.group_id else None
+            if primary_group:
                 try:
                     group_data = {
-                        'id': str(self.group.id),
-                        'name': self.group.name,
-                        'color': self.group.color,
-                        'description': self.group.description
+                        'id': str(primary_group.id),
+                        'name': primary_group.name,
+                        'color': primary_group.color,
+                        'description': primary_group.description
                     }
                 except Exception as group_error:
                     print(f"Error serializing group for host {self.id}: {str(group_error)}")
                     group_data = None
             
-            # Handle multiple groups from group_ids
+            # All groups the host belongs to (host_group_memberships)
             groups_data = []
-            if hasattr(self, 'group_ids') and self.group_ids:
-                try:
-                    group_ids = json.loads(self.group_ids)
-                    for group_id in group_ids:
-                        group = HostGroup.query.get(group_id)
-                        if group:
-                            groups_data.append({
-                                'id': str(group.id),
-                                'name': group.name,
-                                'color': group.color,
-                                'description': group.description
-                            })
-                except Exception as groups_error:
-                    print(f"Error serializing groups for host {self.id}: {str(groups_error)}")
-                    groups_data = []
-            
-            # If no group_ids but has group_id, add primary group to groups list
-            elif self.group_id and group_data:
-                groups_data = [group_data]
+            try:
+                for group_id in group_ids_by_host.get(str(self.id), []):
+                    group = groups_by_id.get(group_id)
+                    if group:
+                        groups_data.append({
+                            'id': str(group.id),
+                            'name': group.name,
+                            'color': group.color,
+                            'description': group.description
+                        })
+            except Exception as groups_error:
+                print(f"Error serializing groups for host {self.id}: {str(groups_error)}")
+                groups_data = []
             
             return {
                 'id': str(self.id),
@@ -260,8 +330,24 @@ class Host(db.Model):
                 'updated_at': None
             }
 
+class HostGroupMembership(db.Model):
+    """Host <-> group association; a host can belong to any number of groups"""
+    __tablename__ = 'host_group_memberships'
+    __table_args__ = (
+        # The primary key serves host -> groups lookups, this index group -> hosts
+        db.Index('ix_host_group_memberships_group_host', 'group_id', 'host_id'),
+    )
+    
+    host_id = db.Column(db.String(36), db.ForeignKey('hosts.id', ondelete='CASCADE'), primary_key=True)
+    group_id = db.Column(db.String(36), db.ForeignKey('host_groups.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Webhook trigger coalescing looks up recent tasks by (webhook, idempotency key)
+        db.Index('ix_tasks_webhook_idempotency_key', 'webhook_id', 'idempotency_key'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     playbook_id = db.Column(db.String(36), db.ForeignKey('playbooks.id'), nullable=False)
@@ -275,6 +361,9 @@ class Task(db.Model):
     host_list = db.Column(db.Text)  # JSON string of all hosts in multi-host execution
     webhook_id = db.Column(db.String(36), db.ForeignKey('webhooks.id'), nullable=True)  # Track webhook-triggered tasks
     serial_id = db.Column(db.Integer, nullable=True)  # Sequential ID for display
+    priority = db.Column(db.Integer, default=0)  # Higher runs first when the execution queue is ordered by priority
+    idempotency_key = db.Column(db.String(128), nullable=True)  # Webhook trigger key (explicit or payload fingerprint)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     playbook = db.relationship('Playbook', backref='tasks')
     host = db.relationship('Host', backref='tasks')
@@ -284,34 +373,8 @@ class Task(db.Model):
     # Note: serial_id is now a real database column, no virtual property needed
     
     def get_global_serial_id(self):
-        """Get global sequential ID - use stored serial_id if available, otherwise calculate"""
-        # FIRST: Check if we have a stored serial_id
-        if self.serial_id is not None:
-            return self.serial_id
-            
-        # FALLBACK: Calculate next available ID for new tasks
-        try:
-            from sqlalchemy import func
-            
-            # Get the highest serial ID from existing tasks
-            max_task_id = Task.query.with_entities(
-                func.max(Task.serial_id)
-            ).scalar() or 0
-            
-            # Get the highest serial ID from history
-            max_history_id = ExecutionHistory.query.with_entities(
-                func.max(ExecutionHistory.original_task_serial_id)
-            ).scalar() or 0
-            
-            # Use whichever is higher + 1
-            next_id = max(max_task_id, max_history_id) + 1
-            
-            return next_id
-            
-        except Exception as e:
-            print(f"Error calculating task serial ID: {e}")
-            # Final fallback
-            return 1
+        """Global sequential ID, assigned when the task is created (legacy rows are backfilled at startup)"""
+        return self.serial_id
     
     def to_dict(self):
         import json
@@ -357,6 +420,7 @@ class Task(db.Model):
             'host_id': str(self.host_id) if self.host_id else None,
             'user_id': str(self.user_id) if self.user_id else None,
             'status': self.status,
+            'priority': self.priority or 0,
             'started_at': self.started_at.isoformat() + 'Z' if self.started_at else None,
             'finished_at': self.finished_at.isoformat() + 'Z' if self.finished_at else None,
             'output': self.output,
@@ -456,6 +520,7 @@ class Webhook(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_triggered = db.Column(db.DateTime)
     trigger_count = db.Column(db.Integer, default=0)
+    coalesce_window_seconds = db.Column(db.Integer, default=0)  # Merge identical triggers within this window (0 = off)
     
     playbook = db.relationship('Playbook', backref='webhooks')
     credential = db.relationship('Credential', backref='webhooks')
@@ -495,6 +560,7 @@ class Webhook(db.Model):
             'updated_at': self.updated_at.isoformat() + 'Z',
             'last_triggered': self.last_triggered.isoformat() + 'Z' if self.last_triggered else None,
             'trigger_count': self.trigger_count,
+            'coalesce_window_seconds': self.coalesce_window_seconds or 0,
             'playbook': self.playbook.to_dict() if self.playbook else None,
             'credential': self.credential.to_dict() if self.credential else None,
             'user': self.user.to_dict() if self.user else None,
@@ -518,37 +584,20 @@ class ExecutionHistory(db.Model):
     webhook_id = db.Column(db.String(36))  # Track webhook-triggered executions (no FK until webhooks table ready)
     original_task_id = db.Column(db.String(36), unique=True, nullable=False) # The original task's UUID
     original_task_serial_id = db.Column(db.Integer)  # Store the original task's sequential ID
+    serial_id = db.Column(db.Integer, index=True)  # Same number as the task it came from (shared numbering)
     
     playbook = db.relationship('Playbook', backref='history')
     host = db.relationship('Host', backref='history')
     user = db.relationship('User', backref='history')  # User who executed the task
     # Note: Webhook relationships will be added when those tables exist
     
-    # Virtual properties for fields that don't exist in database yet
-    @property
-    def serial_id(self):
-        """Virtual serial_id property - will be replaced with real column when migrated"""
-        try:
-            # Count all executions that started at or before this execution's start time
-            return ExecutionHistory.query.filter(ExecutionHistory.started_at <= self.started_at).count()
-        except:
-            return None
-    
     # user_id is now a real column, no virtual property needed
     
     def get_global_serial_id(self):
-        """Get global sequential ID - ALWAYS use stored original_task_serial_id if available"""
-        # FIRST: Check if we have the original task serial ID stored
-        if self.original_task_serial_id:
-            return self.original_task_serial_id
-        
-        # FALLBACK: Calculate based on position (for old records without original_task_serial_id)
-        try:
-            return ExecutionHistory.query.filter(
-                ExecutionHistory.id <= self.id
-            ).count()
-        except:
-            return 1
+        """Get global sequential ID - stored serial_id, or the original task's ID on rows not yet backfilled"""
+        if self.serial_id is not None:
+            return self.serial_id
+        return self.original_task_serial_id
     
     def to_dict_light(self):
         """Lightweight version for dashboard and quick previews - excludes heavy output data"""
@@ -706,6 +755,11 @@ class ExecutionHistory(db.Model):
             'original_task_id': self.original_task_id
         }
 
+# Keyset pagination of the history list walks (finished_at DESC NULLS LAST, id DESC);
+# the index has the same ordering so a page is a forward index range scan
+db.Index('ix_execution_history_finished_desc_id',
+         ExecutionHistory.finished_at.desc().nullslast(), ExecutionHistory.id.desc())
+
 class ApiToken(db.Model):
     __tablename__ = 'api_tokens'
     
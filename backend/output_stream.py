@@ -0,0 +1,174 @@
+"""
+Batched Socket.IO delivery of task output.
+
+Executors used to emit one 'task_output' event per stdout line, which under
+-vvv means tens of thousands of websocket frames per run. TaskOutputBatcher
+coalesces lines into chunks that are flushed every OUTPUT_BATCH_INTERVAL_MS
+milliseconds (default 50) or once OUTPUT_BATCH_MAX_KB kilobytes (default 64)
+are buffered, whichever comes first.
+
+Each chunk is emitted only to the task's Socket.IO room (clients join it
+with 'join_task') as:
+    {'task_id': ..., 'seq': n, 'lines': [...], 'output': '\\n'.join(lines)}
+where seq increases by one per chunk, so clients can detect gaps/duplicates.
+When a tail store is attached, every line is also recorded there and the
+chunk carries 'cursor' (tail cursor of its first line) and 'next', so
+WebSocket batches and /tail polling can be merged without duplicates.
+
+Dashboards that only need progress join the SUMMARY_ROOM ('join_dashboard')
+and receive a small 'task_summary' event at most every
+OUTPUT_SUMMARY_INTERVAL_MS (default 1000) per running task.
+"""
+
+import os
+import threading
+import time
+
+
+def _env_number(name, default, cast):
+    try:
+        return cast(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+OUTPUT_BATCH_INTERVAL = _env_number('OUTPUT_BATCH_INTERVAL_MS', 50, float) / 1000.0
+OUTPUT_BATCH_MAX_BYTES = _env_number('OUTPUT_BATCH_MAX_KB', 64, int) * 1024
+OUTPUT_SUMMARY_INTERVAL = _env_number('OUTPUT_SUMMARY_INTERVAL_MS', 1000, float) / 1000.0
+
+# Room for lightweight per-task progress events (task list / dashboard views)
+SUMMARY_ROOM = 'task_summaries'
+
+# Batchers holding unflushed lines; the flusher thread drains them on the interval
+_pending_batchers = set()
+_pending_lock = threading.Lock()
+_flusher_started = False
+
+
+def _flusher_loop():
+    while True:
+        time.sleep(OUTPUT_BATCH_INTERVAL)
+        now = time.monotonic()
+        with _pending_lock:
+            batchers = list(_pending_batchers)
+        for batcher in batchers:
+            try:
+                batcher.flush_if_due(now)
+            except Exception as e:
+                print(f"⚠️ Output batch flush error for task {batcher.task_id}: {e}")
+
+
+def _mark_pending(batcher):
+    global _flusher_started
+    with _pending_lock:
+        _pending_batchers.add(batcher)
+        if not _flusher_started:
+            _flusher_started = True
+            thread = threading.Thread(target=_flusher_loop, name='task-output-flusher')
+            thread.daemon = True
+            thread.start()
+
+
+def _clear_pending(batcher):
+    with _pending_lock:
+        _pending_batchers.discard(batcher)
+
+
+class TaskOutputBatcher:
+    """Coalesce output lines of one task into time/size-bounded 'task_output' events"""
+
+    def __init__(self, socketio, task_id, interval=None, max_bytes=None, tail_store=None):
+        self.socketio = socketio
+        self.task_id = str(task_id)
+        self.tail_store = tail_store
+        self.interval = OUTPUT_BATCH_INTERVAL if interval is None else interval
+        self.max_bytes = OUTPUT_BATCH_MAX_BYTES if max_bytes is None else max_bytes
+        self.seq = 0
+        self.total_lines = 0
+        self._last_line = ''
+        self._last_summary_at = 0.0
+        self._lines = []
+        self._bytes = 0
+        self._first_at = None
+        self._first_cursor = None
+        self._lock = threading.Lock()
+        # Serializes emits so chunks always leave in sequence order
+        self._emit_lock = threading.Lock()
+
+    def write(self, line):
+        with self._lock:
+            if self.tail_store is not None:
+                cursor = self.tail_store.append(self.task_id, line)
+                if not self._lines:
+                    self._first_cursor = cursor
+            self._lines.append(line)
+            self._bytes += len(line) + 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+                _mark_pending(self)
+            full = self._bytes >= self.max_bytes
+        if full:
+            self.flush()
+
+    def flush_if_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = self._first_at is not None and (now - self._first_at) >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._emit_lock:
+            with self._lock:
+                if not self._lines:
+                    return
+                lines = self._lines
+                first_cursor = self._first_cursor
+                self._lines = []
+                self._bytes = 0
+                self._first_at = None
+                self._first_cursor = None
+                self.seq += 1
+                seq = self.seq
+                _clear_pending(self)
+
+            payload = {
+                'task_id': self.task_id,
+                'seq': seq,
+                'lines': lines,
+                'output': '\n'.join(lines)
+            }
+            if first_cursor is not None:
+                payload['cursor'] = first_cursor
+                payload['next'] = first_cursor + len(lines)
+            try:
+                self.socketio.emit('task_output', payload, room=self.task_id)
+            except Exception as e:
+                print(f"❌ Failed to emit output batch {seq} for task {self.task_id}: {e}")
+
+            self.total_lines += len(lines)
+            self._last_line = lines[-1]
+            self._emit_summary()
+
+    def _emit_summary(self, force=False):
+        now = time.monotonic()
+        if not force and (now - self._last_summary_at) < OUTPUT_SUMMARY_INTERVAL:
+            return
+        self._last_summary_at = now
+        try:
+            self.socketio.emit('task_summary', {
+                'task_id': self.task_id,
+                'seq': self.seq,
+                'lines': self.total_lines,
+                'last_line': self._last_line[-200:]
+            }, room=SUMMARY_ROOM)
+        except Exception as e:
+            print(f"⚠️ Failed to emit summary for task {self.task_id}: {e}")
+
+    def close(self):
+        """Flush whatever is left; call once the process output has been fully read"""
+        self.flush()
+        with self._emit_lock:
+            self._emit_summary(force=True)
+        if self.tail_store is not None:
+            self.tail_store.finish(self.task_id)
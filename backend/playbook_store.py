@@ -0,0 +1,140 @@
+"""
+Content-addressed, immutable copies of playbooks for execution.
+
+Executors used to rewrite PLAYBOOKS_DIR/<name>.yml from playbook.content before
+every run, so each run paid a write, and two runs of the same playbook with
+different content (an edit or Git sync in between) could overwrite each
+other's file mid-run. PlaybookStore instead writes each distinct content once
+to PLAYBOOKS_DIR/.playbook-<sha256>.yml:
+
+    playbook_path = playbook_store.acquire(playbook.content, owner=task_id)
+    ... ansible-playbook playbook_path ...
+    playbook_store.release(task_id)
+
+- The file is written to a temporary name and renamed into place, so a reader
+  never sees a partial file, and it is never modified afterwards.
+- Runs with the same content share one file; acquire() only writes when the
+  hash is not on disk yet.
+- Files are reference counted per owner (task). A file nobody references is
+  deleted once unused for PLAYBOOK_STORE_RETENTION_SECONDS, so the next run
+  of an unchanged playbook usually finds it still there.
+
+The copies live next to the named playbooks (not in a subdirectory) so that
+relative paths and roles resolve from the same playbook_dir as before.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+STORE_PREFIX = '.playbook-'
+STORE_SUFFIX = '.yml'
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+PLAYBOOK_STORE_RETENTION_SECONDS = max(0.0, _env_float('PLAYBOOK_STORE_RETENTION_SECONDS', 3600))
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class PlaybookStore:
+    """Write-once playbook files keyed by content hash, with per-owner reference counts"""
+
+    def __init__(self, root, retention=None):
+        self.root = root
+        self.retention = PLAYBOOK_STORE_RETENTION_SECONDS if retention is None else retention
+        self._lock = threading.Lock()
+        self._refs = {}        # digest -> number of owners holding it
+        self._owners = {}      # owner -> [digest, ...]
+        self._released = {}    # digest -> monotonic time its last reference was released
+
+    def path_for(self, digest):
+        return os.path.join(self.root, f'{STORE_PREFIX}{digest}{STORE_SUFFIX}')
+
+    def acquire(self, content, owner):
+        """Path of an immutable file holding content, referenced by owner until release(owner)"""
+        digest = content_hash(content)
+        path = self.path_for(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                self._write(path, content)
+                print(f"📦 Stored playbook content {digest[:12]} ({len(content)} characters)")
+            else:
+                print(f"📦 Reusing stored playbook content {digest[:12]}")
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            self._owners.setdefault(owner, []).append(digest)
+            self._released.pop(digest, None)
+        return path
+
+    def _write(self, path, content):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.playbook-tmp-', suffix=STORE_SUFFIX)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def release(self, owner):
+        """Drop every reference held by owner, then delete files unused for longer than the retention"""
+        now = time.monotonic()
+        with self._lock:
+            for digest in self._owners.pop(owner, []):
+                remaining = self._refs.get(digest, 0) - 1
+                if remaining > 0:
+                    self._refs[digest] = remaining
+                else:
+                    self._refs.pop(digest, None)
+                    self._released[digest] = now
+            self._collect(now)
+
+    def _collect(self, now):
+        expired = [digest for digest, released_at in self._released.items()
+                   if now - released_at >= self.retention]
+        for digest in expired:
+            self._released.pop(digest, None)
+            try:
+                os.unlink(self.path_for(digest))
+            except OSError:
+                pass
+
+    def sweep(self):
+        """Delete unreferenced store files older than the retention (e.g. left by a previous process)"""
+        cutoff = time.time() - self.retention
+        removed = 0
+        with self._lock:
+            try:
+                names = os.listdir(self.root)
+            except OSError:
+                return 0
+            for name in names:
+                if not name.startswith(STORE_PREFIX):
+                    continue
+                digest = name[len(STORE_PREFIX):-len(STORE_SUFFIX)] if name.endswith(STORE_SUFFIX) else None
+                if digest in self._refs:
+                    continue
+                path = os.path.join(self.root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            print(f"🧹 Removed {removed} unused stored playbook file(s)")
+        return removed
@@ -0,0 +1,262 @@
+"""
+Bounded execution scheduler for playbook runs.
+
+Tasks are queued as 'pending' rows in the tasks table and handed to a fixed
+pool of worker threads, so a burst of executions never starts more
+ansible-playbook processes than the configured limits allow.
+
+A job may have a prepare stage (e.g. pulling a Git playbook). Such a task
+goes pending -> syncing -> running: the worker runs prepare(*args), which
+returns the arguments for the execution, then marks the task 'running'
+unless it was terminated meanwhile.
+
+Configuration (environment variables):
+    MAX_CONCURRENT_EXECUTIONS    size of the worker pool (default 4)
+    MAX_CONCURRENT_PER_PLAYBOOK  running tasks allowed per playbook (0 = pool size)
+    EXECUTION_QUEUE_ORDER        'priority' (default) or 'fifo'
+"""
+
+import os
+import queue
+import threading
+from datetime import datetime
+
+from models import db, Task
+
+# Task statuses of queued or executing tasks
+ACTIVE_TASK_STATUSES = ['pending', 'syncing', 'running']
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class ExecutionScheduler:
+    """Dispatch pending tasks to a bounded pool of execution workers"""
+
+    def __init__(self, app, socketio, max_workers=None, max_per_playbook=None, ordering=None, poll_interval=2.0):
+        self.app = app
+        self.socketio = socketio
+        self.max_workers = max(1, max_workers or _env_int('MAX_CONCURRENT_EXECUTIONS', 4))
+        if max_per_playbook is None:
+            max_per_playbook = _env_int('MAX_CONCURRENT_PER_PLAYBOOK', 0)
+        self.max_per_playbook = max_per_playbook if max_per_playbook > 0 else self.max_workers
+        self.ordering = (ordering or os.environ.get('EXECUTION_QUEUE_ORDER', 'priority')).lower()
+        self.poll_interval = poll_interval
+
+        # Execution arguments (credentials included) are only kept in memory;
+        # the queue order and state live in the tasks table.
+        self._jobs = {}      # task_id -> (playbook_id, target, args, prepare)
+        self._active = {}    # task_id -> playbook_id
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._ready = queue.Queue()
+        self._started = False
+
+    def start(self):
+        """Start the dispatcher and worker threads (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self._fail_orphaned_tasks()
+
+        for index in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'execution-worker-{index}')
+            worker.daemon = True
+            worker.start()
+
+        dispatcher = threading.Thread(target=self._dispatch_loop, name='execution-dispatcher')
+        dispatcher.daemon = True
+        dispatcher.start()
+
+        print(f"✅ Execution scheduler started: {self.max_workers} workers, "
+              f"{self.max_per_playbook} per playbook, ordering={self.ordering}")
+
+    def submit(self, task_id, playbook_id, target, args, prepare=None):
+        """Queue an already committed 'pending' task for execution (optionally preceded by a prepare stage)"""
+        with self._lock:
+            self._jobs[str(task_id)] = (str(playbook_id), target, args, prepare)
+            queued = len(self._jobs)
+        print(f"📥 Task {task_id} queued for execution ({queued} queued, {len(self._active)} running)")
+        self._wakeup.set()
+
+    def cancel(self, task_id):
+        """Drop a queued task so it is never dispatched"""
+        with self._lock:
+            removed = self._jobs.pop(str(task_id), None) is not None
+        if removed:
+            print(f"🗑️ Task {task_id} removed from execution queue")
+        return removed
+
+    def status(self):
+        with self._lock:
+            running_per_playbook = {}
+            for playbook_id in self._active.values():
+                running_per_playbook[playbook_id] = running_per_playbook.get(playbook_id, 0) + 1
+            return {
+                'max_workers': self.max_workers,
+                'max_per_playbook': self.max_per_playbook,
+                'ordering': self.ordering,
+                'running': len(self._active),
+                'queued': len(self._jobs),
+                'running_per_playbook': running_per_playbook
+            }
+
+    def _fail_orphaned_tasks(self):
+        """Pending tasks left over from a previous process can't be resumed (credentials were never persisted)"""
+        try:
+            with self.app.app_context():
+                with self._lock:
+                    queued_ids = set(self._jobs.keys())
+                orphaned = [t for t in Task.query.filter(Task.status.in_(['pending', 'syncing'])).all() if t.id not in queued_ids]
+                for task in orphaned:
+                    task.status = 'failed'
+                    task.finished_at = datetime.utcnow()
+                    task.error_output = 'Task was still queued when the server restarted. Please run it again.'
+                if orphaned:
+                    db.session.commit()
+                    print(f"⚠️ Marked {len(orphaned)} orphaned queued task(s) as failed")
+        except Exception as e:
+            print(f"⚠️ Could not recover orphaned queued tasks: {e}")
+
+    def _dispatch_loop(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                self._dispatch()
+            except Exception as e:
+                print(f"❌ Execution scheduler dispatch error: {e}")
+
+    def _dispatch(self):
+        with self._lock:
+            if not self._jobs or len(self._active) >= self.max_workers:
+                return 0
+            queued_ids = list(self._jobs.keys())
+
+        dispatched = 0
+        with self.app.app_context():
+            try:
+                query = Task.query.with_entities(Task.id, Task.playbook_id).filter(
+                    Task.id.in_(queued_ids),
+                    Task.status == 'pending'
+                )
+                if self.ordering == 'priority':
+                    query = query.order_by(Task.priority.desc(), Task.serial_id.asc())
+                else:
+                    query = query.order_by(Task.serial_id.asc())
+                candidates = query.all()
+
+                # Jobs whose task was deleted or terminated while queued are dropped
+                pending_ids = {task_id for task_id, _ in candidates}
+                with self._lock:
+                    for task_id in queued_ids:
+                        if task_id not in pending_ids:
+                            self._jobs.pop(task_id, None)
+
+                for task_id, playbook_id in candidates:
+                    with self._lock:
+                        if len(self._active) >= self.max_workers:
+                            break
+                        playbook_running = sum(1 for p in self._active.values() if p == str(playbook_id))
+                        if playbook_running >= self.max_per_playbook:
+                            continue
+                        job = self._jobs.pop(task_id, None)
+                        if job is None:
+                            continue
+
+                    # Claim the task atomically so a concurrent terminate wins cleanly
+                    status = 'syncing' if job[3] else 'running'
+                    claimed = Task.query.filter_by(id=task_id, status='pending').update(
+                        {'status': status}, synchronize_session=False
+                    )
+                    db.session.commit()
+                    if not claimed:
+                        continue
+
+                    with self._lock:
+                        self._active[task_id] = str(playbook_id)
+                    self._ready.put((task_id, job))
+                    dispatched += 1
+
+                    self.socketio.emit('task_update', {
+                        'task_id': str(task_id),
+                        'status': status
+                    })
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+        return dispatched
+
+    def _worker_loop(self):
+        while True:
+            task_id, (playbook_id, target, args, prepare) = self._ready.get()
+            try:
+                if prepare:
+                    print(f"🔄 Worker {threading.current_thread().name} preparing task {task_id}")
+                    try:
+                        args = prepare(*args)
+                    except Exception as e:
+                        print(f"❌ Prepare stage failed for task {task_id}: {e}")
+                        self._fail_prepare(task_id, f"Preparing the execution failed: {e}")
+                        continue
+                    if not self._mark_running(task_id):
+                        print(f"⏹️ Task {task_id} was terminated while syncing, not executing it")
+                        continue
+                print(f"🚀 Worker {threading.current_thread().name} executing task {task_id}")
+                target(*args)
+            except Exception as e:
+                print(f"❌ Execution worker error for task {task_id}: {e}")
+            finally:
+                with self._lock:
+                    self._active.pop(task_id, None)
+                self._wakeup.set()
+
+    def _mark_running(self, task_id):
+        """syncing -> running, unless the task was terminated/deleted during the prepare stage"""
+        with self.app.app_context():
+            try:
+                claimed = Task.query.filter_by(id=task_id, status='syncing').update(
+                    {'status': 'running'}, synchronize_session=False
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        if claimed:
+            self.socketio.emit('task_update', {
+                'task_id': str(task_id),
+                'status': 'running'
+            })
+        return bool(claimed)
+
+    def _fail_prepare(self, task_id, message):
+        with self.app.app_context():
+            try:
+                failed = Task.query.filter_by(id=task_id, status='syncing').update(
+                    {'status': 'failed', 'finished_at': datetime.utcnow(), 'error_output': message},
+                    synchronize_session=False
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Could not mark task {task_id} as failed: {e}")
+                failed = 0
+            finally:
+                db.session.remove()
+        if failed:
+            self.socketio.emit('task_update', {
+                'task_id': str(task_id),
+                'status': 'failed',
+                'message': message
+            })
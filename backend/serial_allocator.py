@@ -0,0 +1,94 @@
+"""
+Atomic allocation of the sequential IDs shown for tasks and execution history.
+
+IDs used to be computed as MAX(tasks.serial_id, history serial) + 1 on every
+execution, which scans both tables and hands the same number to two webhooks
+triggered at the same moment. SerialAllocator instead draws from a single
+counter that the database increments atomically:
+
+- PostgreSQL: the execution_serial_seq sequence (nextval)
+- anything else (the SQLite fallback): a one-row counter in the serial_counters
+  table, incremented and read back in its own short transaction
+
+The counter is created on first use and raised to the highest ID already in
+use, so it continues the existing numbering. Like any sequence, an ID taken by
+a request that later fails is not reused.
+"""
+
+import threading
+
+from sqlalchemy import text
+
+SERIAL_SEQUENCE = 'execution_serial_seq'
+SERIAL_COUNTER_NAME = 'execution'
+
+_MAX_SERIAL_SQL = """
+    SELECT MAX(value) FROM (
+        SELECT MAX(CAST(serial_id AS INTEGER)) AS value FROM tasks
+        UNION ALL
+        SELECT MAX(serial_id) AS value FROM execution_history
+        UNION ALL
+        SELECT MAX(original_task_serial_id) AS value FROM execution_history
+    ) AS serials
+"""
+
+
+class SerialAllocator:
+    """Hands out task serial IDs from a database sequence (or counter table)"""
+
+    def __init__(self, db):
+        self.db = db
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def uses_sequence(self):
+        return self.db.engine.dialect.name == 'postgresql'
+
+    def ensure(self):
+        """Create the sequence/counter if needed and move it past every ID already in use"""
+        with self._lock:
+            if self._ready:
+                return
+            with self.db.engine.begin() as conn:
+                highest = conn.execute(text(_MAX_SERIAL_SQL)).scalar() or 0
+                if self.uses_sequence:
+                    conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {SERIAL_SEQUENCE}"))
+                    last_value, is_called = conn.execute(
+                        text(f"SELECT last_value, is_called FROM {SERIAL_SEQUENCE}")
+                    ).fetchone()
+                    current = last_value if is_called else last_value - 1
+                    if highest > current:
+                        conn.execute(text("SELECT setval(:sequence, :value, true)"),
+                                     {'sequence': SERIAL_SEQUENCE, 'value': highest})
+                else:
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS serial_counters (
+                            name VARCHAR(64) PRIMARY KEY,
+                            value INTEGER NOT NULL
+                        )
+                    """))
+                    exists = conn.execute(text("SELECT 1 FROM serial_counters WHERE name = :name"),
+                                          {'name': SERIAL_COUNTER_NAME}).fetchone()
+                    if exists:
+                        conn.execute(text("UPDATE serial_counters SET value = :value WHERE name = :name AND value < :value"),
+                                     {'name': SERIAL_COUNTER_NAME, 'value': highest})
+                    else:
+                        conn.execute(text("INSERT INTO serial_counters (name, value) VALUES (:name, :value)"),
+                                     {'name': SERIAL_COUNTER_NAME, 'value': highest})
+            self._ready = True
+            print(f"🔢 Serial ID allocator ready ({'sequence ' + SERIAL_SEQUENCE if self.uses_sequence else 'serial_counters table'}, highest existing ID {highest})")
+
+    def next_id(self):
+        """Allocate the next serial ID; never returns the same value twice"""
+        if not self._ready:
+            self.ensure()
+        if self.uses_sequence:
+            with self.db.engine.begin() as conn:
+                return conn.execute(text("SELECT nextval(:sequence)"), {'sequence': SERIAL_SEQUENCE}).scalar()
+        # The UPDATE takes the database write lock, so the read-back sees our own increment
+        with self.db.engine.begin() as conn:
+            conn.execute(text("UPDATE serial_counters SET value = value + 1 WHERE name = :name"),
+                         {'name': SERIAL_COUNTER_NAME})
+            return conn.execute(text("SELECT value FROM serial_counters WHERE name = :name"),
+                                {'name': SERIAL_COUNTER_NAME}).scalar()
@@ -0,0 +1,141 @@
+"""
+In-memory tail of recent task output, used by GET /api/tasks/<id>/tail as a
+fallback when WebSockets are unavailable.
+
+Every task gets a fixed-capacity ring buffer (preallocated slots, capped in
+lines and bytes). Lines are addressed by a monotonic cursor: the first line a
+task ever wrote is 0, the next is 1, and so on, regardless of how much has
+been dropped from the front of the buffer. Readers pass the cursor they got
+back last time and only receive newer lines.
+
+Buffers of finished tasks are evicted after TASK_TAIL_RETENTION_SECONDS, and
+buffers nobody has written to for TASK_TAIL_IDLE_SECONDS are evicted too, so
+memory does not grow with the number of tasks ever run.
+"""
+
+import os
+import threading
+import time
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+TASK_TAIL_LINES = _env_int('TASK_TAIL_LINES', 1000)
+TASK_TAIL_MAX_BYTES = _env_int('TASK_TAIL_MAX_KB', 256) * 1024
+TASK_TAIL_RETENTION_SECONDS = _env_int('TASK_TAIL_RETENTION_SECONDS', 300)
+TASK_TAIL_IDLE_SECONDS = _env_int('TASK_TAIL_IDLE_SECONDS', 3600)
+
+
+class TailBuffer:
+    """Ring buffer of one task's most recent output lines"""
+
+    def __init__(self, capacity, max_bytes):
+        self.capacity = max(1, capacity)
+        self.max_bytes = max_bytes
+        self._slots = [None] * self.capacity
+        self._sizes = [0] * self.capacity
+        self.start = 0   # cursor of the oldest retained line
+        self.end = 0     # cursor the next appended line will get
+        self.bytes = 0
+        self.finished_at = None
+        self.last_write = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _drop_oldest(self):
+        slot = self.start % self.capacity
+        self.bytes -= self._sizes[slot]
+        self._slots[slot] = None
+        self._sizes[slot] = 0
+        self.start += 1
+
+    def append(self, line):
+        """Store a line and return its cursor"""
+        size = len(line.encode('utf-8', 'replace'))
+        with self.lock:
+            if self.end - self.start >= self.capacity:
+                self._drop_oldest()
+            slot = self.end % self.capacity
+            self._slots[slot] = line
+            self._sizes[slot] = size
+            self.bytes += size
+            cursor = self.end
+            self.end += 1
+            # Keep at least the newest line even if it alone exceeds the byte cap
+            while self.bytes > self.max_bytes and self.end - self.start > 1:
+                self._drop_oldest()
+            self.last_write = time.monotonic()
+            return cursor
+
+    def read(self, since=0):
+        with self.lock:
+            if since is None or since < 0 or since > self.end:
+                # Unknown cursor (e.g. from before a server restart): start from what we have
+                since = self.start
+            truncated = since < self.start
+            since = max(since, self.start)
+            lines = [self._slots[i % self.capacity] for i in range(since, self.end)]
+            return {
+                'lines': lines,
+                'next': self.end,
+                'start': self.start,
+                'truncated': truncated
+            }
+
+
+class TaskTailStore:
+    """Per-task TailBuffers with eviction of finished and abandoned tasks"""
+
+    def __init__(self, capacity=None, max_bytes=None, retention_seconds=None, idle_seconds=None):
+        self.capacity = capacity or TASK_TAIL_LINES
+        self.max_bytes = max_bytes or TASK_TAIL_MAX_BYTES
+        self.retention_seconds = TASK_TAIL_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        self.idle_seconds = TASK_TAIL_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _buffer(self, task_id, create=False):
+        task_id = str(task_id)
+        with self._lock:
+            self._maybe_sweep()
+            buffer = self._buffers.get(task_id)
+            if buffer is None and create:
+                buffer = TailBuffer(self.capacity, self.max_bytes)
+                self._buffers[task_id] = buffer
+            return buffer
+
+    def _maybe_sweep(self):
+        # Caller holds self._lock
+        now = time.monotonic()
+        if now - self._last_sweep < 30:
+            return
+        self._last_sweep = now
+        expired = [
+            task_id for task_id, buffer in self._buffers.items()
+            if (buffer.finished_at is not None and now - buffer.finished_at > self.retention_seconds)
+            or now - buffer.last_write > self.idle_seconds
+        ]
+        for task_id in expired:
+            del self._buffers[task_id]
+        if expired:
+            print(f"🧹 Evicted output tail buffers for {len(expired)} task(s)")
+
+    def append(self, task_id, line):
+        return self._buffer(task_id, create=True).append(line)
+
+    def read(self, task_id, since=0):
+        buffer = self._buffer(task_id)
+        if buffer is None:
+            return {'lines': [], 'next': since if since and since > 0 else 0, 'start': 0, 'truncated': False}
+        return buffer.read(since)
+
+    def finish(self, task_id):
+        """Mark a task's output complete; its buffer is evicted after the retention period"""
+        buffer = self._buffer(task_id)
+        if buffer is not None:
+            buffer.finished_at = time.monotonic()
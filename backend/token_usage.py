@@ -0,0 +1,163 @@
+"""
+API token lookup cache and write-behind usage accounting.
+
+authenticate_api_token used to load the token row and then commit an UPDATE
+of last_used/usage_count on every webhook trigger, so concurrent triggers
+using the same token queued up on that row's lock. Now:
+
+- ApiTokenCache keeps a snapshot (id, name, expires_at) of each valid token
+  for API_TOKEN_CACHE_TTL_SECONDS. Expiry is still checked on every call;
+  create/update/delete/regenerate invalidate the cache so disabled or rotated
+  tokens stop working immediately in this process.
+- TokenUsageRecorder counts uses in memory and a background thread writes
+  the totals every API_TOKEN_USAGE_FLUSH_SECONDS in one transaction
+  (usage_count = usage_count + n). Pending counts are also flushed at exit and
+  are added to GET /api/tokens so the list does not lag behind.
+
+Uses recorded between the last flush and a crash are lost.
+"""
+
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+API_TOKEN_CACHE_TTL_SECONDS = max(0.0, _env_float('API_TOKEN_CACHE_TTL_SECONDS', 30))
+API_TOKEN_USAGE_FLUSH_SECONDS = max(0.5, _env_float('API_TOKEN_USAGE_FLUSH_SECONDS', 5))
+
+_FLUSH_USAGE_SQL = text("""
+    UPDATE api_tokens
+    SET usage_count = COALESCE(usage_count, 0) + :count,
+        last_used = CASE WHEN last_used IS NULL OR last_used < :last_used THEN :last_used ELSE last_used END
+    WHERE id = :id
+""")
+
+
+class CachedApiToken:
+    """Detached view of an enabled ApiToken row"""
+
+    __slots__ = ('id', 'name', 'expires_at')
+
+    def __init__(self, api_token):
+        self.id = str(api_token.id)
+        self.name = api_token.name
+        self.expires_at = api_token.expires_at
+
+    def is_expired(self, now=None):
+        return bool(self.expires_at and self.expires_at < (now or datetime.utcnow()))
+
+
+class ApiTokenCache:
+    """token value -> CachedApiToken for enabled tokens, each entry expiring after ttl seconds"""
+
+    def __init__(self, ttl=None):
+        self.ttl = API_TOKEN_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, token, loader):
+        """Cached token, calling loader() (returns an enabled ApiToken or None) on a miss"""
+        now = time.monotonic()
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._entries.get(token)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        api_token = loader()
+        if api_token is None:
+            # Unknown/disabled tokens are not cached
+            return None
+        cached = CachedApiToken(api_token)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[token] = (now + self.ttl, cached)
+        return cached
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenUsageRecorder:
+    """Aggregates token uses in memory and writes them in batches"""
+
+    def __init__(self, app, db, interval=None):
+        self.app = app
+        self.db = db
+        self.interval = interval or API_TOKEN_USAGE_FLUSH_SECONDS
+        self._pending = {}   # token id -> [count, last_used]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._started = False
+
+    def record(self, token_id, when=None):
+        when = when or datetime.utcnow()
+        with self._lock:
+            usage = self._pending.get(token_id)
+            if usage:
+                usage[0] += 1
+                usage[1] = max(usage[1], when)
+            else:
+                self._pending[token_id] = [1, when]
+            if not self._started:
+                self._start()
+
+    def pending(self, token_id):
+        """(count, last_used) not yet written for a token, or (0, None)"""
+        with self._lock:
+            usage = self._pending.get(str(token_id))
+            return (usage[0], usage[1]) if usage else (0, None)
+
+    def discard(self, token_id):
+        """Forget unwritten uses (the token's counters were reset)"""
+        with self._lock:
+            self._pending.pop(str(token_id), None)
+
+    def _start(self):
+        self._started = True
+        thread = threading.Thread(target=self._flush_loop, name='token-usage-flusher')
+        thread.daemon = True
+        thread.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ API token usage flush failed: {e}")
+
+    def flush(self):
+        """Write all pending counts in one transaction; they are kept for the next try on failure"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            rows = [{'id': token_id, 'count': count, 'last_used': last_used}
+                    for token_id, (count, last_used) in batch.items()]
+            try:
+                with self.app.app_context():
+                    with self.db.engine.begin() as conn:
+                        conn.execute(_FLUSH_USAGE_SQL, rows)
+            except Exception:
+                with self._lock:
+                    for token_id, (count, last_used) in batch.items():
+                        usage = self._pending.setdefault(token_id, [0, last_used])
+                        usage[0] += count
+                        usage[1] = max(usage[1], last_used)
+                raise
+            return len(rows)
@@ -0,0 +1,219 @@
+"""
+Resumable, chunked uploads of playbook files.
+
+A multi-GB file (ISO, package repository) sent as one multipart request has
+to get through in one go: a dropped connection or proxy timeout loses the
+whole transfer. An upload session instead takes the file as a sequence of raw
+chunks, each written straight from the request stream to disk:
+
+    POST   /api/playbooks/<id>/files/uploads              {filename, size, sha256?, description?}
+    PATCH  /api/playbooks/<id>/files/uploads/<upload_id>   body: bytes, header Upload-Offset
+    GET    /api/playbooks/<id>/files/uploads/<upload_id>   -> {offset, size} to resume after a failure
+    POST   /api/playbooks/<id>/files/uploads/<upload_id>/complete
+
+A chunk is only accepted at the current offset. With a Chunk-SHA256 header it
+is verified and rolled back on mismatch. On completion the whole file's
+SHA-256 is computed server side, checked against the declared sha256 (if
+any), and the file is moved into the content-addressed FileStore without a
+copy.
+
+Sessions live on disk under FILES_DIR/uploads (metadata JSON plus the partial
+data), so an upload can be resumed after a backend restart. Sessions not
+written to for UPLOAD_SESSION_TTL_SECONDS are removed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+UPLOAD_SESSION_TTL_SECONDS = max(60, _env_int('UPLOAD_SESSION_TTL_SECONDS', 86400))
+UPLOAD_CHUNK_SIZE = max(1024 * 1024, _env_int('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+
+_COPY_SIZE = 1024 * 1024
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadSessions:
+    """Upload sessions persisted as <upload_id>.json + <upload_id>.part under root"""
+
+    def __init__(self, root, ttl=None):
+        self.root = os.path.abspath(os.path.join(root, 'uploads'))
+        self.ttl = UPLOAD_SESSION_TTL_SECONDS if ttl is None else ttl
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock_for(self, upload_id):
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _paths(self, upload_id):
+        return (os.path.join(self.root, f'{upload_id}.json'),
+                os.path.join(self.root, f'{upload_id}.part'))
+
+    def create(self, playbook_id, filename, size, sha256=None, description=''):
+        """New session; returns (session, error) where error is (message, status) or None"""
+        if not isinstance(size, int) or size < 0:
+            return None, ('size must be a non-negative integer', 400)
+        if sha256 is not None:
+            sha256 = str(sha256).strip().lower()
+            if not _SHA256.match(sha256):
+                return None, ('sha256 must be a hex SHA-256 digest', 400)
+        self.sweep()
+        os.makedirs(self.root, exist_ok=True)
+        session = {
+            'upload_id': uuid.uuid4().hex,
+            'playbook_id': playbook_id,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'description': description or '',
+            'created_at': time.time(),
+        }
+        meta_path, part_path = self._paths(session['upload_id'])
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w', encoding='utf-8') as meta_file:
+            json.dump(session, meta_file)
+        return self._with_offset(session, part_path), None
+
+    def get(self, upload_id, playbook_id=None):
+        """Session with its current offset, or None when unknown (or of another playbook)"""
+        if not _UPLOAD_ID.match(upload_id or ''):
+            return None
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                session = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        if playbook_id is not None and session.get('playbook_id') != playbook_id:
+            return None
+        return self._with_offset(session, part_path)
+
+    def _received(self, upload_id):
+        """Bytes received so far, or None once the session was completed, aborted or swept; call under its lock"""
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            if not os.path.exists(meta_path):
+                return None
+            return os.path.getsize(part_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _with_offset(session, part_path):
+        session = dict(session)
+        try:
+            session['offset'] = os.path.getsize(part_path)
+        except OSError:
+            session['offset'] = 0
+        session['chunk_size'] = UPLOAD_CHUNK_SIZE
+        return session
+
+    def append(self, session, offset, stream, chunk_sha256=None):
+        """
+        Write the stream's bytes at offset, which must be the session's current offset.
+        Returns (new_offset, error) where error is (message, status) or None.
+        """
+        upload_id = session['upload_id']
+        _, part_path = self._paths(upload_id)
+        with self._lock_for(upload_id):
+            current = self._received(upload_id)
+            if current is None:
+                return 0, ('Upload not found', 404)
+            if offset != current:
+                return current, (f'Upload-Offset {offset} does not match the current offset {current}', 409)
+            remaining = session['size'] - current
+            sha = hashlib.sha256()
+            written = 0
+            with open(part_path, 'r+b') as part_file:
+                part_file.seek(current)
+                for chunk in iter(lambda: stream.read(_COPY_SIZE), b''):
+                    written += len(chunk)
+                    if written > remaining:
+                        part_file.truncate(current)
+                        return current, (f'Chunk exceeds the declared size of {session["size"]} bytes', 413)
+                    sha.update(chunk)
+                    part_file.write(chunk)
+                if chunk_sha256 and sha.hexdigest() != chunk_sha256.strip().lower():
+                    part_file.truncate(current)
+                    return current, ('Chunk checksum mismatch', 422)
+            return current + written, None
+
+    def finish(self, session, file_store, record):
+        """
+        Verify a fully received upload, move it into file_store and call record(digest, size, path)
+        while holding the object's lock, so the object can't be discarded before it is recorded.
+        Returns (record's result, error) where error is (message, status) or None.
+        """
+        upload_id = session['upload_id']
+        meta_path, part_path = self._paths(upload_id)
+        with self._lock_for(upload_id):
+            received = self._received(upload_id)
+            if received is None:
+                return None, ('Upload not found', 404)
+            if received != session['size']:
+                return None, (f'Upload incomplete: {received} of {session["size"]} bytes received', 409)
+            sha = hashlib.sha256()
+            with open(part_path, 'rb') as part_file:
+                for chunk in iter(lambda: part_file.read(_COPY_SIZE), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            if session.get('sha256') and session['sha256'] != digest:
+                self._remove(upload_id)
+                return None, (f'Checksum mismatch: expected {session["sha256"]}, got {digest}', 422)
+            with file_store.lock(digest):
+                path = file_store.adopt(part_path, digest)
+                self._remove(upload_id)
+                return record(digest, received, path), None
+
+    def abort(self, upload_id):
+        with self._lock_for(upload_id):
+            self._remove(upload_id)
+
+    def _remove(self, upload_id):
+        for path in self._paths(upload_id):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+
+    def sweep(self):
+        """Remove sessions whose data has not changed for longer than the TTL"""
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            upload_id = name[:-len('.json')]
+            meta_path, part_path = self._paths(upload_id)
+            try:
+                last_write = max(os.path.getmtime(meta_path),
+                                 os.path.getmtime(part_path) if os.path.exists(part_path) else 0)
+            except OSError:
+                continue
+            if last_write < cutoff:
+                with self._lock_for(upload_id):
+                    self._remove(upload_id)
+                removed += 1
+        if removed:
+            print(f"🧹 Removed {removed} expired upload session(s)")
+        return removed
@@ -0,0 +1,92 @@
+"""
+Coalescing of repeated webhook triggers into one task.
+
+CI systems retry and fan out, so the same webhook is often called several
+times within seconds, each call starting a full ansible-playbook run. A
+trigger can now be matched to a task created earlier for the same webhook:
+
+- Idempotency key: the Idempotency-Key header (or "idempotency_key" in the
+  body). A repeated key returns the task created for it, within the
+  webhook's coalescing window or WEBHOOK_IDEMPOTENCY_KEY_TTL_SECONDS,
+  whichever is longer.
+- Coalescing window: webhooks with coalesce_window_seconds > 0 also merge
+  triggers without a key whose payload is identical (same hosts, variables,
+  credentials, priority) within that many seconds.
+
+The key is stored on the task (tasks.idempotency_key) and looked up per
+webhook, so a match is found across restarts and backend processes. Within a
+process, a striped lock serializes lookup and task creation for the same key,
+so simultaneous identical triggers create only one task.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from models import Task
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+WEBHOOK_IDEMPOTENCY_KEY_TTL_SECONDS = max(0, _env_int('WEBHOOK_IDEMPOTENCY_KEY_TTL_SECONDS', 86400))
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+
+
+def trigger_fingerprint(data):
+    """Stable hash of a trigger payload (everything except the idempotency key)"""
+    payload = {key: value for key, value in (data or {}).items() if key != 'idempotency_key'}
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return 'fp:' + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def resolve_idempotency_key(headers, data, coalesce_window_seconds):
+    """
+    (key, window_seconds) for a trigger, or (None, 0) when it should never be coalesced.
+    """
+    explicit_key = headers.get('Idempotency-Key') or (data or {}).get('idempotency_key')
+    if explicit_key:
+        explicit_key = str(explicit_key).strip()
+        if len(explicit_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            explicit_key = 'sha256:' + hashlib.sha256(explicit_key.encode('utf-8')).hexdigest()
+        return explicit_key, max(coalesce_window_seconds or 0, WEBHOOK_IDEMPOTENCY_KEY_TTL_SECONDS)
+    if coalesce_window_seconds and coalesce_window_seconds > 0:
+        return trigger_fingerprint(data), coalesce_window_seconds
+    return None, 0
+
+
+class TriggerCoalescer:
+    """Finds the task an idempotency key already produced and serializes admission per key"""
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    @contextmanager
+    def hold(self, webhook_id, key):
+        """Serialize lookup + task creation for one (webhook, key); no-op without a key"""
+        if not key:
+            yield
+            return
+        lock = self._locks[hash((webhook_id, key)) % len(self._locks)]
+        with lock:
+            yield
+
+    def find_task_id(self, webhook_id, key, window_seconds):
+        """ID of the newest task this webhook created for key within the window, or None"""
+        if not key:
+            return None
+        since = datetime.utcnow() - timedelta(seconds=window_seconds)
+        row = (Task.query.with_entities(Task.id)
+               .filter(Task.webhook_id == webhook_id,
+                       Task.idempotency_key == key,
+                       Task.created_at >= since)
+               .order_by(Task.created_at.desc())
+               .first())
+        return row[0] if row else None
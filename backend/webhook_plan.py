@@ -0,0 +1,168 @@
+"""
+Cached execution plans for webhook triggers.
+
+A webhook trigger used to load the webhook, its playbook, credential, assigned
+variables and configured hosts on every call, then commit the new task and the
+webhook statistics in two separate transactions. A WebhookPlan is everything
+about a webhook that does not depend on the request, resolved once:
+
+    plan = webhook_plans.get(webhook_token)      # None if the token is unknown
+    variables = plan.variables(request_variables)
+    host_objects = plan.configured_host_objects
+
+Plans are cached per webhook token for WEBHOOK_PLAN_TTL_SECONDS. Any commit
+that inserts, updates or deletes a webhook, playbook, host, host group,
+membership, variable or credential through the ORM drops every cached plan
+(see install_invalidation), so edits apply to the next trigger; the TTL only
+bounds staleness from writes made outside the ORM or by other processes.
+WEBHOOK_PLAN_TTL_SECONDS=0 disables the cache.
+"""
+
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+from models import Webhook, Playbook, Host, HostGroup, HostGroupMembership, Variable, Credential
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+WEBHOOK_PLAN_TTL_SECONDS = max(0.0, _env_float('WEBHOOK_PLAN_TTL_SECONDS', 30))
+
+# Changes to rows of these models can change a plan
+PLAN_SOURCE_MODELS = (Webhook, Playbook, Host, HostGroup, HostGroupMembership, Variable, Credential)
+
+
+class WebhookPlan:
+    """Request-independent part of a webhook trigger, detached from the session"""
+
+    def __init__(self, webhook):
+        self.webhook_id = webhook.id
+        self.enabled = bool(webhook.enabled)
+        self.user_id = webhook.user_id
+        self.coalesce_window_seconds = webhook.coalesce_window_seconds or 0
+        self.error = None                  # (message, status) when the webhook cannot run at all
+        self.configured_hosts_error = None  # (message, status) when configured hosts are needed but unusable
+        self.playbook_data = None
+        self.base_variables = {}
+        self.configured_host_objects = []
+        self.primary_host_id = None
+        self.has_configured_hosts = bool(webhook.host_ids)
+        self.credential_username = None
+        self.credential_password = None
+
+        playbook = webhook.playbook
+        if not playbook:
+            self.error = ('Playbook not found', 404)
+            return
+        self.playbook_data = {
+            'id': playbook.id,
+            'name': playbook.name,
+            'content': playbook.content,
+            'os_type': playbook.os_type  # Add OS type for proper Windows/Linux handling
+        }
+
+        # Priority 1: webhook default variables, Priority 2: playbook assigned variables
+        if webhook.default_variables:
+            try:
+                self.base_variables.update(json.loads(webhook.default_variables))
+            except Exception:
+                pass
+        if playbook.assigned_variables:
+            try:
+                assigned_variable_ids = json.loads(playbook.assigned_variables)
+                if assigned_variable_ids:
+                    for var in Variable.query.filter(Variable.id.in_(assigned_variable_ids)).all():
+                        self.base_variables[var.key] = var.value
+            except Exception as e:
+                print(f"Warning: Failed to load assigned variables: {e}")
+
+        if webhook.host_ids:
+            try:
+                host_ids = json.loads(webhook.host_ids)
+                hosts_by_id = {host.id: host for host in Host.query.filter(Host.id.in_(host_ids)).all()} if host_ids else {}
+                hosts = [hosts_by_id[host_id] for host_id in host_ids if host_id in hosts_by_id]
+                self.configured_host_objects = Host.to_dict_many(hosts)
+                self.primary_host_id = hosts[0].id if hosts else None
+                if not hosts:
+                    self.configured_hosts_error = ('No valid configured hosts found', 400)
+            except Exception:
+                self.configured_hosts_error = ('Invalid host configuration', 500)
+
+        if webhook.credential_id:
+            credential = webhook.credential
+            if credential:
+                self.credential_username = credential.username
+                self.credential_password = credential.password  # Note: In production, this should be encrypted
+
+    def variables(self, request_variables=None):
+        """Plan variables overridden by the request's (Priority 3), as a new dict"""
+        variables = dict(self.base_variables)
+        if isinstance(request_variables, dict):
+            variables.update(request_variables)
+        return variables
+
+
+class WebhookPlanCache:
+    """webhook token -> WebhookPlan, each entry expiring after ttl seconds"""
+
+    def __init__(self, ttl=None):
+        self.ttl = WEBHOOK_PLAN_TTL_SECONDS if ttl is None else ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, webhook_token):
+        now = time.monotonic()
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._entries.get(webhook_token)
+                generation = self._generation
+            if entry and entry[0] > now:
+                return entry[1]
+        else:
+            generation = self._generation
+
+        webhook = Webhook.query.filter_by(token=webhook_token).first()
+        if not webhook:
+            return None
+        plan = WebhookPlan(webhook)
+        if self.ttl > 0:
+            with self._lock:
+                # Skip caching if an invalidation happened while the plan was being built
+                if generation == self._generation:
+                    self._entries[webhook_token] = (now + self.ttl, plan)
+        return plan
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def install_invalidation(self, session_class):
+        """Drop cached plans after any commit that wrote a PLAN_SOURCE_MODELS row"""
+
+        def after_flush(session, flush_context):
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                if isinstance(obj, PLAN_SOURCE_MODELS):
+                    session.info['webhook_plans_stale'] = True
+                    return
+
+        def after_commit(session):
+            if session.info.pop('webhook_plans_stale', False):
+                self.invalidate()
+
+        def after_rollback(session):
+            session.info.pop('webhook_plans_stale', None)
+
+        event.listen(session_class, 'after_flush', after_flush)
+        event.listen(session_class, 'after_commit', after_commit)
+        event.listen(session_class, 'after_rollback', after_rollback)
@@ -51,7 +51,6 @@ const History = () => {
   const [filteredHistory, setFilteredHistory] = useState([]);
   const [loading, setLoading] = useState(false);
   const [loadingMore, setLoadingMore] = useState(false);
-  const [currentPage, setCurrentPage] = useState(1);
   const [hasMore, setHasMore] = useState(true);
   const [totalRecords, setTotalRecords] = useState(0);
   const [outputModalVisible, setOutputModalVisible] = useState(false);
@@ -65,6 +64,7 @@ const History = () => {
   const useInfiniteScroll = true; // Always use infinite scroll
   const intervalRef = useRef(null);
   const isPageVisible = useRef(true);
+  const nextCursorRef = useRef(null); // Keyset cursor for the page after the loaded records
   
   // Cache for full execution details (only load when needed)
   const [executionDetailsCache, setExecutionDetailsCache] = useState(new Map());
@@ -101,7 +101,7 @@ const History = () => {
     // Reset state and load initial data
     setHistory([]);
     setFilteredHistory([]);
-    setCurrentPage(1);
+    nextCursorRef.current = null;
     setHasMore(true);
     fetchHistory(true, true);
   }, []); // Only run on mount
@@ -138,47 +138,48 @@ const History = () => {
   };
 
   const fetchHistoryWithInfiniteScroll = async (isManualRefresh = false, reset = false) => {
-    const pageToLoad = reset ? 1 : currentPage;
     const recordsPerPage = 25; // Increased to show more records per page
     
     // Show appropriate loading state
     if (isManualRefresh || reset) {
       setLoading(true);
-    } else if (pageToLoad > 1) {
-      setLoadingMore(true);
     }
 
     try {
-      // Use light=true for faster loading with smaller payloads
-      const response = await historyAPI.getPaginatedLight(pageToLoad, recordsPerPage);
+      // Always (re)load the newest page; light keyset pages never carry output blobs.
+      // The total costs a COUNT(*), so background refreshes don't ask for it
+      const withTotal = isManualRefresh || reset;
+      const response = await historyAPI.getPage('', recordsPerPage, withTotal ? { with_total: true } : {});
       const historyData = response.data.data || response.data;
       const pagination = response.data.pagination || {};
       
-      if (reset || pageToLoad === 1) {
+      if (reset || isManualRefresh || nextCursorRef.current === null) {
         // First load or reset - replace all data
         setHistory(historyData);
         setFilteredHistory(historyData);
-        setCurrentPage(1);
+        nextCursorRef.current = pagination.next_cursor || null;
+        setHasMore(!!pagination.has_next);
       } else {
-        // Load more - append to existing data
-        setHistory(prev => [...prev, ...historyData]);
-        setFilteredHistory(prev => [...prev, ...historyData]);
+        // Background refresh - put the newest records on top, keep the older pages already loaded
+        const freshIds = new Set(historyData.map(h => h.id));
+        const mergeFresh = prev => [...historyData, ...prev.filter(h => !freshIds.has(h.id))];
+        setHistory(mergeFresh);
+        setFilteredHistory(mergeFresh);
       }
       
       // Update pagination state
-      setTotalRecords(pagination.total || historyData.length);
-      setHasMore(pagination.has_next !== false && historyData.length === recordsPerPage);
+      if (withTotal) {
+        setTotalRecords(pagination.total || historyData.length);
+      }
       setLastRefresh(new Date());
       
-      console.log(`⚡ History loaded: ${historyData.length} records (page ${pageToLoad}, total: ${history.length + historyData.length}) - LIGHT MODE`);
+      console.log(`⚡ History loaded: ${historyData.length} records (newest page, total: ${pagination.total}) - LIGHT MODE`);
     } catch (error) {
       console.error('Failed to fetch execution history', error);
       message.error('Failed to fetch execution history');
     } finally {
       if (isManualRefresh || reset) {
         setLoading(false);
-      } else {
-        setLoadingMore(false);
       }
     }
   };
@@ -186,16 +187,13 @@ const History = () => {
 
 
   const loadMoreRecords = async () => {
-    if (loadingMore || !hasMore) return;
-    
-    const nextPage = currentPage + 1;
-    setCurrentPage(nextPage);
+    if (loadingMore || !hasMore || !nextCursorRef.current) return;
     
     const recordsPerPage = 25; // Match the initial load size
     setLoadingMore(true);
 
     try {
-      const response = await historyAPI.getPaginatedLight(nextPage, recordsPerPage);
+      const response = await historyAPI.getPage(nextCursorRef.current, recordsPerPage);
       const historyData = response.data.data || response.data;
       const pagination = response.data.pagination || {};
       
@@ -204,10 +202,10 @@ const History = () => {
       setFilteredHistory(prev => [...prev, ...historyData]);
       
       // Update pagination state
-      setTotalRecords(pagination.total || totalRecords);
-      setHasMore(pagination.has_next !== false && historyData.length === recordsPerPage);
+      nextCursorRef.current = pagination.next_cursor || null;
+      setHasMore(!!pagination.has_next);
       
-      console.log(`📊 Loaded more: ${historyData.length} records (page ${nextPage}, total: ${history.length + historyData.length})`);
+      console.log(`📊 Loaded more: ${historyData.length} records (total: ${history.length + historyData.length})`);
     } catch (error) {
       console.error('Failed to load more records', error);
       message.error('Failed to load more records');
@@ -18,7 +18,10 @@ import {
   Col,
   Tabs,
   Badge,
-  ColorPicker
+  ColorPicker,
+  Tooltip,
+  Upload,
+  Alert
 } from 'antd';
 import {
   PlusOutlined,
@@ -28,9 +31,12 @@ import {
   GlobalOutlined,
   GroupOutlined,
   UnorderedListOutlined,
-  SettingOutlined
+  SettingOutlined,
+  ClearOutlined,
+  UploadOutlined
 } from '@ant-design/icons';
 import { hostsAPI, hostGroupsAPI } from '../services/api';
+import socketService from '../services/socket';
 import { hasPermission } from '../utils/permissions';
 import moment from 'moment';
 
@@ -54,6 +60,9 @@ const Hosts = ({ currentUser }) => {
   const [groupForm] = Form.useForm();
   const [selectedRowKeys, setSelectedRowKeys] = useState([]);
   const [bulkDeleteLoading, setBulkDeleteLoading] = useState(false);
+  const [bulkFile, setBulkFile] = useState(null);
+  const [bulkSubmitting, setBulkSubmitting] = useState(false);
+  const [importProgress, setImportProgress] = useState(null);
 
   useEffect(() => {
     fetchHosts();
@@ -156,6 +165,8 @@ const Hosts = ({ currentUser }) => {
 
   const handleBulkCreate = () => {
     bulkForm.resetFields();
+    setBulkFile(null);
+    setImportProgress(null);
     setBulkModalVisible(true);
   };
 
@@ -184,6 +195,16 @@ const Hosts = ({ currentUser }) => {
     setGroupModalVisible(true);
   };
 
+  const handleClearFacts = async (id) => {
+    try {
+      await hostsAPI.clearFacts(id);
+      message.success('Cached facts cleared');
+      fetchHosts();
+    } catch (error) {
+      message.error('Failed to clear cached facts');
+    }
+  };
+
   const handleDelete = async (id) => {
     try {
       await hostsAPI.delete(id);
@@ -260,20 +281,46 @@ const Hosts = ({ currentUser }) => {
   };
 
   const handleBulkSubmit = async (values) => {
-    try {
-      const ips = values.ips.split(/[\n,]/).map(ip => ip.trim()).filter(ip => ip);
-      
-      if (ips.length === 0) {
-        message.error('Please enter at least one IP address');
-        return;
+    const ips = (values.ips || '').split(/[\n,]/).map(ip => ip.trim()).filter(ip => ip);
+
+    if (ips.length === 0 && !bulkFile) {
+      message.error('Please enter at least one IP address or choose a file');
+      return;
+    }
+
+    // Large imports are committed in chunks; follow their progress over the socket
+    const importId = window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+    const handleImportProgress = (progress) => {
+      if (progress.import_id === importId) {
+        setImportProgress(progress);
       }
+    };
+    setBulkSubmitting(true);
+    setImportProgress(null);
+    socketService.connect();
+    socketService.on('host_import_progress', handleImportProgress);
+    await socketService.joinHostImport(importId);
 
-      const response = await hostsAPI.createBulk({
-        ips,
-        group_id: values.group_id,
-        description: values.description || '',
-        allow_duplicates: true  // Allow creating/updating existing hosts
-      });
+    try {
+      let response;
+      if (bulkFile) {
+        const formData = new FormData();
+        formData.append('file', bulkFile);
+        formData.append('ips', ips.join('\n'));
+        formData.append('group_id', values.group_id || '');
+        formData.append('description', values.description || '');
+        formData.append('allow_duplicates', 'true');
+        formData.append('import_id', importId);
+        response = await hostsAPI.createBulkFromFile(formData);
+      } else {
+        response = await hostsAPI.createBulk({
+          ips,
+          group_id: values.group_id,
+          description: values.description || '',
+          allow_duplicates: true,  // Allow creating/updating existing hosts
+          import_id: importId
+        });
+      }
 
       const { total_created, total_updated, total_errors, errors, message: responseMessage } = response.data;
       
@@ -298,10 +345,17 @@ const Hosts = ({ currentUser }) => {
 
       setBulkModalVisible(false);
       bulkForm.resetFields();
+      setBulkFile(null);
       fetchHosts();
     } catch (error) {
-      message.error('Failed to create hosts in bulk');
+      message.error(error.response?.data?.error || 'Failed to create hosts in bulk');
       console.error('Bulk creation error:', error);
+      // Chunks committed before a failure stay imported
+      fetchHosts();
+    } finally {
+      socketService.off('host_import_progress', handleImportProgress);
+      socketService.leaveHostImport(importId);
+      setBulkSubmitting(false);
     }
   };
 
@@ -426,6 +480,20 @@ const Hosts = ({ currentUser }) => {
       key: 'description',
       ellipsis: true,
     },
+    {
+      title: 'Facts',
+      dataIndex: 'facts',
+      key: 'facts',
+      render: (facts) => {
+        if (!facts?.cached) return <Tag>Not cached</Tag>;
+        return (
+          <Tooltip title={`Gathered ${moment(facts.gathered_at).format('MMM DD, YYYY HH:mm')}, reused until ${moment(facts.expires_at).format('MMM DD, YYYY HH:mm')}`}>
+            <Tag color="green">Cached {moment(facts.gathered_at).fromNow()}</Tag>
+          </Tooltip>
+        );
+      },
+      width: 150,
+    },
     {
       title: 'Created',
       dataIndex: 'created_at',
@@ -440,9 +508,23 @@ const Hosts = ({ currentUser }) => {
     {
       title: 'Actions',
       key: 'actions',
-      width: 120,
+      width: 160,
       render: (_, record) => (
         <Space>
+          {hasPermission(currentUser, 'edit') && record.facts?.cached && (
+            <Popconfirm
+              title="Clear cached facts? The next run will gather them again."
+              onConfirm={() => handleClearFacts(record.id)}
+              okText="Yes"
+              cancelText="No"
+            >
+              <Button
+                type="text"
+                icon={<ClearOutlined />}
+                title="Clear cached facts"
+              />
+            </Popconfirm>
+          )}
           {hasPermission(currentUser, 'edit') ? (
             <Button
               type="text"
@@ -831,7 +913,7 @@ const Hosts = ({ currentUser }) => {
           </Space>
         }
         open={bulkModalVisible}
-        onCancel={() => setBulkModalVisible(false)}
+        onCancel={() => !bulkSubmitting && setBulkModalVisible(false)}
         footer={null}
         width={600}
       >
@@ -843,18 +925,37 @@ const Hosts = ({ currentUser }) => {
           <Form.Item
             label="IP Addresses"
             name="ips"
-            rules={[{ required: true, message: 'Please enter IP addresses' }]}
-            extra="Enter IP addresses separated by commas or new lines"
+            rules={[{ required: !bulkFile, message: 'Please enter IP addresses or choose a file' }]}
+            extra="Enter IP addresses, CIDR blocks (10.0.0.0/24) or ranges (10.0.0.1-50) separated by commas or new lines"
           >
             <Input.TextArea
               rows={8}
               placeholder={`192.168.1.10
 192.168.1.11
 192.168.1.12
-Or: 192.168.1.10, 192.168.1.11, 192.168.1.12`}
+Or: 192.168.1.10, 192.168.1.11, 192.168.1.12
+Or: 192.168.2.0/24, 192.168.3.1-192.168.3.50`}
             />
           </Form.Item>
 
+          <Form.Item
+            label="Import File"
+            extra="CSV or newline-separated file; the first column of each row is used"
+          >
+            <Upload
+              accept=".csv,.txt"
+              maxCount={1}
+              fileList={bulkFile ? [bulkFile] : []}
+              beforeUpload={(file) => {
+                setBulkFile(file);
+                return false;  // Sent with the form, not uploaded on selection
+              }}
+              onRemove={() => setBulkFile(null)}
+            >
+              <Button icon={<UploadOutlined />}>Choose File</Button>
+            </Upload>
+          </Form.Item>
+
           <Form.Item
             label="Assign to Group"
             name="group_id"
@@ -877,12 +978,22 @@ Or: 192.168.1.10, 192.168.1.11, 192.168.1.12`}
             <Input placeholder="Description for all hosts (optional)" />
           </Form.Item>
 
+          {importProgress && (
+            <Form.Item>
+              <Alert
+                type={importProgress.failed ? 'error' : importProgress.done ? 'success' : 'info'}
+                showIcon
+                message={`${importProgress.processed} processed: ${importProgress.created} created, ${importProgress.updated} updated, ${importProgress.errors} error(s)`}
+              />
+            </Form.Item>
+          )}
+
           <Form.Item>
             <Space>
-              <Button type="primary" htmlType="submit">
+              <Button type="primary" htmlType="submit" loading={bulkSubmitting}>
                 Create Hosts
               </Button>
-              <Button onClick={() => setBulkModalVisible(false)}>
+              <Button onClick={() => setBulkModalVisible(false)} disabled={bulkSubmitting}>
                 Cancel
               </Button>
             </Space>
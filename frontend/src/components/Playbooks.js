@@ -465,11 +465,7 @@ const Playbooks = ({ currentUser }) => {
       return;
     }
 
-    // Upload immediately with progress
-    const formData = new FormData();
-    formData.append('file', file);
-    formData.append('description', '');
-
+    // Upload immediately with progress (in resumable chunks)
     console.log('🚀 Starting upload to existing playbook:', editingPlaybook.id);
 
     try {
@@ -479,11 +475,11 @@ const Playbooks = ({ currentUser }) => {
       setUploadProgress(0);
       console.log('✅ Upload states set - loading should now be visible');
       
-      const response = await playbookFilesAPI.upload(
+      const response = await playbookFilesAPI.uploadChunked(
         editingPlaybook.id,
-        formData,
+        file,
+        '',
         {
-          timeout: 600000, // 10 minutes timeout for large files
           onUploadProgress: (event) => {
             if (event.total) {
               const percent = Math.round((event.loaded * 100) / event.total);
@@ -577,17 +573,13 @@ const Playbooks = ({ currentUser }) => {
         setUploadingFileName(tempFile.filename);
         setUploadProgress(0);
         
-        const formData = new FormData();
-        formData.append('file', tempFile.fileObject);
-        formData.append('description', tempFile.description);
-        
         console.log(`🚀 Uploading temp file ${i + 1}/${tempFiles.length}: ${tempFile.filename}`);
         
-        const response = await playbookFilesAPI.upload(
+        const response = await playbookFilesAPI.uploadChunked(
           playbookId, 
-          formData,
+          tempFile.fileObject,
+          tempFile.description,
           {
-            timeout: 600000, // 10 minutes timeout for large files
             onUploadProgress: (event) => {
               if (event.total) {
                 const percent = Math.round((event.loaded * 100) / event.total);
@@ -22,7 +22,8 @@ import {
   CloseCircleOutlined,
   ClockCircleOutlined,
   ReloadOutlined,
-  HistoryOutlined
+  HistoryOutlined,
+  SyncOutlined
 } from '@ant-design/icons';
 import { tasksAPI } from '../services/api';
 import socketService from '../services/socket';
@@ -39,8 +40,10 @@ const TaskDetail = () => {
   const [redirecting, setRedirecting] = useState(false);
   const [redirectCountdown, setRedirectCountdown] = useState(0);
   const [wsConnected, setWsConnected] = useState(false);
-  const [tailIndex, setTailIndex] = useState(0);
+  // Tail cursor: index of the next output line we haven't rendered yet (shared by WS batches and /tail polling)
+  const tailCursorRef = useRef(0);
   const tailIntervalRef = useRef(null);
+  const lastOutputSeqRef = useRef(0);
   const outputRef = useRef(null);
   const redirectTimeoutRef = useRef(null);
   const countdownIntervalRef = useRef(null);
@@ -71,7 +74,8 @@ const TaskDetail = () => {
     const handleTaskUpdate = (data) => {
       if (data.task_id === taskId) {
         setTask(prevTask => {
-          const newTask = { ...prevTask, status: data.status };
+          // Stage messages (e.g. Git sync) carry no status
+          const newTask = { ...prevTask, status: data.status || prevTask?.status };
           
           // Check if task just completed and trigger redirect
           if (prevTask && prevTask.status !== data.status && 
@@ -87,14 +91,62 @@ const TaskDetail = () => {
       }
     };
 
+    // Fetch output lines from the tail cursor onwards (fallback polling and gap backfill)
+    const fetchTail = async () => {
+      try {
+        const res = await fetch(`/api/tasks/${taskId}/tail?since=${tailCursorRef.current}`, {
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+          }
+        });
+        if (res.ok) {
+          const data = await res.json();
+          if (Array.isArray(data.lines) && data.lines.length > 0) {
+            // WS batches may have advanced the cursor while this request was in flight
+            const firstCursor = data.next - data.lines.length;
+            const alreadySeen = Math.max(0, tailCursorRef.current - firstCursor);
+            const freshLines = data.lines.slice(alreadySeen);
+            tailCursorRef.current = Math.max(tailCursorRef.current, data.next);
+            if (freshLines.length === 0) return;
+            setOutput(prev => {
+              const merged = prev.concat(freshLines);
+              return merged.slice(-200);
+            });
+            // Scroll down
+            setTimeout(() => {
+              if (outputRef.current) {
+                outputRef.current.scrollTop = outputRef.current.scrollHeight;
+              }
+            }, 10);
+          }
+        }
+      } catch (e) {}
+    };
+
     const handleTaskOutput = (data) => {
-      console.log('🔴 TASKDETAIL: handleTaskOutput called with:', data);
-      // ACCEPT ALL MESSAGES, IGNORE TASK ID FOR NOW
-      setOutput(prevOutput => {
-        const newOutput = [...prevOutput, `[${data.task_id || 'unknown'}] ${data.output || 'NO OUTPUT'}`];
-        console.log('🔴 TASKDETAIL: Added output, new total lines:', newOutput.length);
-        return newOutput.slice(-200);
-      });
+      // Output is delivered to this task's room only; ignore anything else defensively
+      if (data.task_id && String(data.task_id) !== String(taskId)) return;
+      // Output arrives in batches: { seq, lines: [...], output: lines joined }
+      if (typeof data.seq === 'number') {
+        // Ignore batches we've already rendered (e.g. delivered twice after a reconnect)
+        if (data.seq <= lastOutputSeqRef.current) return;
+        lastOutputSeqRef.current = data.seq;
+      }
+      let lines = Array.isArray(data.lines) ? data.lines : [data.output || 'NO OUTPUT'];
+      if (typeof data.cursor === 'number') {
+        if (data.cursor > tailCursorRef.current) {
+          // Lines before this batch were never seen (e.g. task opened mid-run): backfill from
+          // the current cursor instead of skipping them; the backfill includes this batch too
+          fetchTail();
+          return;
+        }
+        // Skip lines already picked up by tail polling
+        const alreadySeen = tailCursorRef.current - data.cursor;
+        if (alreadySeen >= lines.length) return;
+        if (alreadySeen > 0) lines = lines.slice(alreadySeen);
+        tailCursorRef.current = data.cursor + (Array.isArray(data.lines) ? data.lines.length : 1);
+      }
+      setOutput(prevOutput => prevOutput.concat(lines).slice(-200));
         
       // Force scroll to bottom
       setTimeout(() => {
@@ -181,31 +233,7 @@ const TaskDetail = () => {
     // Fallback tail polling every 1s to ensure output appears even if WS fails
     const startTailPolling = () => {
       if (tailIntervalRef.current) return;
-      tailIntervalRef.current = setInterval(async () => {
-        try {
-          const res = await fetch(`/api/tasks/${taskId}/tail?since=${tailIndex}`, {
-            headers: {
-              'Authorization': `Bearer ${localStorage.getItem('token')}`
-            }
-          });
-          if (res.ok) {
-            const data = await res.json();
-            if (Array.isArray(data.lines) && data.lines.length > 0) {
-              setOutput(prev => {
-                const merged = prev.concat(data.lines);
-                return merged.slice(-200);
-              });
-              setTailIndex(data.next || (tailIndex + data.lines.length));
-              // Scroll down
-              setTimeout(() => {
-                if (outputRef.current) {
-                  outputRef.current.scrollTop = outputRef.current.scrollHeight;
-                }
-              }, 10);
-            }
-          }
-        } catch (e) {}
-      }, 1000);
+      tailIntervalRef.current = setInterval(fetchTail, 1000);
     };
 
     startTailPolling();
@@ -459,6 +487,8 @@ const TaskDetail = () => {
     switch (status) {
       case 'pending':
         return <ClockCircleOutlined style={{ color: '#faad14' }} />;
+      case 'syncing':
+        return <SyncOutlined spin style={{ color: '#1890ff' }} />;
       case 'running':
         return <PlayCircleOutlined style={{ color: '#1890ff' }} />;
       case 'completed':
@@ -475,6 +505,7 @@ const TaskDetail = () => {
   const getStatusTag = (status) => {
     const colors = {
       pending: 'warning',
+      syncing: 'processing',
       running: 'processing',
       completed: 'success',
       partial: 'orange',
@@ -771,7 +802,7 @@ const TaskDetail = () => {
               >
                 {output.length === 0 ? (
                   <div style={{ color: '#666', fontStyle: 'italic' }}>
-                    {task.status === 'pending' ? 'Waiting for execution to start...' : 'No output yet...'}
+                    {task.status === 'pending' ? 'Waiting for execution to start...' : task.status === 'syncing' ? 'Syncing playbook from Git...' : 'No output yet...'}
                   </div>
                 ) : (
                   output.map((line, index) => (
@@ -25,14 +25,15 @@ import {
   ReloadOutlined,
   PauseCircleOutlined,
   UserOutlined,
-  ApiOutlined
+  ApiOutlined,
+  SyncOutlined
 } from '@ant-design/icons';
 import { tasksAPI } from '../services/api';
 import { hasPermission } from '../utils/permissions';
 import socketService from '../services/socket';
 import moment from 'moment';
 
-const { Title } = Typography;
+const { Title, Text } = Typography;
 
 const Tasks = ({ currentUser }) => {
   const [tasks, setTasks] = useState([]);
@@ -53,7 +54,7 @@ const Tasks = ({ currentUser }) => {
       setTasks(prevTasks => 
         prevTasks.map(task => 
           task.id === data.task_id 
-            ? { ...task, status: data.status }
+            ? { ...task, status: data.status || task.status }
             : task
         )
       );
@@ -69,7 +70,19 @@ const Tasks = ({ currentUser }) => {
       }
     };
 
+    const handleTaskSummary = (data) => {
+      setTasks(prevTasks =>
+        prevTasks.map(task =>
+          task.id === data.task_id
+            ? { ...task, output_lines: data.lines, last_line: data.last_line }
+            : task
+        )
+      );
+    };
+
     socketService.on('task_update', handleTaskUpdate);
+    socketService.on('task_summary', handleTaskSummary);
+    socketService.subscribeDashboard();
     
     // Set up page visibility listener
     const handleVisibilityChange = () => {
@@ -88,6 +101,8 @@ const Tasks = ({ currentUser }) => {
 
     return () => {
       socketService.off('task_update', handleTaskUpdate);
+      socketService.off('task_summary', handleTaskSummary);
+      socketService.unsubscribeDashboard();
       document.removeEventListener('visibilitychange', handleVisibilityChange);
       stopAutoRefresh();
     };
@@ -167,6 +182,8 @@ const Tasks = ({ currentUser }) => {
     switch (status) {
       case 'pending':
         return <ClockCircleOutlined style={{ color: '#faad14' }} />;
+      case 'syncing':
+        return <SyncOutlined spin style={{ color: '#1890ff' }} />;
       case 'running':
         return <PlayCircleOutlined style={{ color: '#1890ff' }} />;
       case 'completed':
@@ -183,6 +200,7 @@ const Tasks = ({ currentUser }) => {
   const getStatusTag = (status) => {
     const colors = {
       pending: 'warning',
+      syncing: 'processing',
       running: 'processing',
       completed: 'success',
       partial: 'orange',
@@ -305,10 +323,17 @@ const Tasks = ({ currentUser }) => {
       title: 'Progress',
       key: 'progress',
       render: (_, record) => {
-        if (record.status === 'pending') {
+        if (record.status === 'pending' || record.status === 'syncing') {
           return <Progress percent={0} size="small" />;
         } else if (record.status === 'running') {
-          return <Spin size="small" />;
+          return (
+            <Tooltip title={record.last_line || 'Running'}>
+              <Space size="small">
+                <Spin size="small" />
+                {record.output_lines ? <Text type="secondary">{record.output_lines} lines</Text> : null}
+              </Space>
+            </Tooltip>
+          );
         } else if (record.status === 'completed') {
           return <Progress percent={100} size="small" />;
         } else if (record.status === 'failed') {
@@ -19,7 +19,8 @@ import {
   Col,
   Divider,
   Tabs,
-  DatePicker
+  DatePicker,
+  InputNumber
 } from 'antd';
 import {
   PlusOutlined,
@@ -116,7 +117,7 @@ const Webhooks = ({ currentUser }) => {
   const handleCreate = () => {
     setEditingWebhook(null);
     form.resetFields();
-    form.setFieldsValue({ enabled: true });
+    form.setFieldsValue({ enabled: true, coalesce_window_seconds: 0 });
     setModalVisible(true);
   };
 
@@ -148,6 +149,7 @@ const Webhooks = ({ currentUser }) => {
       host_ids: hostIds,
       credential_id: webhook.credential_id,
       enabled: webhook.enabled,
+      coalesce_window_seconds: webhook.coalesce_window_seconds || 0,
       default_variables: defaultVariables
     });
     setModalVisible(true);
@@ -820,6 +822,14 @@ const Webhooks = ({ currentUser }) => {
             <Switch />
           </Form.Item>
 
+          <Form.Item
+            label="Coalescing Window (seconds)"
+            name="coalesce_window_seconds"
+            extra="Identical triggers within this window reuse the same task. 0 disables coalescing; an Idempotency-Key header is always honored."
+          >
+            <InputNumber min={0} style={{ width: '100%' }} />
+          </Form.Item>
+
           <Divider orientation="left">
             <Space>
               <SettingOutlined />
@@ -58,6 +58,40 @@ export const playbookFilesAPI = {
   download: (playbookId, fileId) => api.get(`/playbooks/${playbookId}/files/${fileId}/download`, {
     responseType: 'blob',
   }),
+  // Resumable upload in chunks; a failed chunk is retried from the offset the server has
+  uploadChunked: async (playbookId, file, description = '', { onUploadProgress, retries = 3 } = {}) => {
+    const base = `/playbooks/${playbookId}/files/uploads`;
+    const { data: session } = await api.post(base, { filename: file.name, size: file.size, description });
+    let offset = session.offset;
+    let failures = 0;
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + session.chunk_size);
+      const headers = { 'Content-Type': 'application/octet-stream', 'Upload-Offset': String(offset) };
+      if (window.crypto?.subtle) {
+        const digest = await window.crypto.subtle.digest('SHA-256', await chunk.arrayBuffer());
+        headers['Chunk-SHA256'] = Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+      }
+      try {
+        const { data } = await api.patch(`${base}/${session.upload_id}`, chunk, {
+          headers,
+          timeout: 600000,
+          onUploadProgress: (event) => onUploadProgress?.({ loaded: offset + event.loaded, total: file.size }),
+        });
+        offset = data.offset;
+        failures = 0;
+      } catch (error) {
+        if (error.response?.status === 401 || ++failures > retries) {
+          await api.delete(`${base}/${session.upload_id}`).catch(() => {});
+          throw error;
+        }
+        // Resume from whatever the server has actually stored
+        const { data } = await api.get(`${base}/${session.upload_id}`);
+        offset = data.offset;
+      }
+      onUploadProgress?.({ loaded: offset, total: file.size });
+    }
+    return api.post(`${base}/${session.upload_id}/complete`);
+  },
 };
 
 // Host Groups API
@@ -73,9 +107,17 @@ export const hostsAPI = {
   getAll: () => api.get('/hosts'),
   create: (data) => api.post('/hosts', data),
   createBulk: (data) => api.post('/hosts/bulk', data),
+  // Multipart variant for importing a CSV/newline file of targets
+  createBulkFromFile: (formData) => api.post('/hosts/bulk', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  }),
   update: (id, data) => api.put(`/hosts/${id}`, data),
   delete: (id) => api.delete(`/hosts/${id}`),
   bulkDelete: (hostIds) => api.delete('/hosts/bulk-delete', { data: { host_ids: hostIds } }),
+  getFacts: (id) => api.get(`/hosts/${id}/facts`),
+  clearFacts: (id) => api.delete(`/hosts/${id}/facts`),
 };
 
 // Tasks API
@@ -111,6 +153,11 @@ export const historyAPI = {
     // Lightweight paginated version for history page - faster loading
     return api.get(`/history?light=true&page=${page}&per_page=${perPage}`);
   },
+  getPage: (cursor = '', perPage = 25, params = {}) => {
+    // Keyset pagination: pass '' for the newest page, then the returned next_cursor
+    const queryParams = new URLSearchParams({ cursor, per_page: perPage, ...params });
+    return api.get(`/history?${queryParams}`);
+  },
   getById: (id) => {
     // Get single execution with full details (including output)
     return api.get(`/history/${id}`);
@@ -8,6 +8,7 @@ class SocketService {
   constructor() {
     this.socket = null;
     this.listeners = new Map();
+    this.dashboardSubscribers = 0;
   }
 
   connect() {
@@ -42,6 +43,10 @@ class SocketService {
     this.socket.on('connect', () => {
       console.log('Connected to WebSocket server');
       console.log('Socket ID:', this.socket.id);
+      // Rooms are per-connection, so re-subscribe after reconnects
+      if (this.dashboardSubscribers > 0) {
+        this.socket.emit('join_dashboard');
+      }
     });
 
     this.socket.on('disconnect', () => {
@@ -61,10 +66,56 @@ class SocketService {
     });
 
     this.socket.on('task_output', (data) => {
-      console.log('🔴 SOCKET: Received task_output from server:', data);
+      // task_output events are batches of lines (see backend/output_stream.py)
       this.emit('task_output', data);
-      console.log('🔴 SOCKET: Emitted to', this.listeners.get('task_output')?.length || 0, 'listeners');
     });
+
+    this.socket.on('task_summary', (data) => {
+      this.emit('task_summary', data);
+    });
+
+    this.socket.on('host_import_progress', (data) => {
+      this.emit('host_import_progress', data);
+    });
+  }
+
+  // Progress of a bulk host import is only sent to clients in that import's room;
+  // resolves once the server has acknowledged the join (or after a short timeout)
+  joinHostImport(importId) {
+    return new Promise((resolve) => {
+      if (!this.socket?.connected) {
+        resolve(false);
+        return;
+      }
+      const timer = setTimeout(() => resolve(false), 2000);
+      // Joining is authenticated like the REST API, and only the import's owner may join
+      const token = localStorage.getItem('authToken');
+      this.socket.emit('join_host_import', { import_id: importId, token }, (joined) => {
+        clearTimeout(timer);
+        resolve(Boolean(joined));
+      });
+    });
+  }
+
+  leaveHostImport(importId) {
+    if (this.socket?.connected) {
+      this.socket.emit('leave_host_import', { import_id: importId });
+    }
+  }
+
+  // Lightweight per-task progress (line count, last line) for list/dashboard views
+  subscribeDashboard() {
+    this.dashboardSubscribers += 1;
+    if (this.dashboardSubscribers === 1 && this.socket?.connected) {
+      this.socket.emit('join_dashboard');
+    }
+  }
+
+  unsubscribeDashboard() {
+    this.dashboardSubscribers = Math.max(0, this.dashboardSubscribers - 1);
+    if (this.dashboardSubscribers === 0 && this.socket?.connected) {
+      this.socket.emit('leave_dashboard');
+    }
   }
 
   disconnect() {